@@ -0,0 +1,185 @@
+"""
+Typeahead search over airport names and closest big cities.
+
+On PostgreSQL matching runs in the database on the trigram and prefix
+indexes from migration 0006. Other backends (SQLite in tests) use
+AirportTrie, an in-process word-prefix trie that is rebuilt when airports
+or routes change. Both rank prefix matches of the name first, then of the
+city, then airports with more routes. Both match every query word as the
+prefix of a word of the name or the city.
+"""
+import uuid
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+
+from airport.models import Airport, Route
+
+AIRPORT_SEARCH_VERSION_KEY = "airport-search-version"
+SUGGEST_FIELDS = ("id", "name", "closest_big_city", "route_count")
+
+
+def airport_search_version():
+    return cache.get_or_set(AIRPORT_SEARCH_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_airport_search_version():
+    cache.set(AIRPORT_SEARCH_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def words(text):
+    return text.lower().split()
+
+
+def match_rank(query, name, city):
+    if name.lower().startswith(query):
+        return 0
+    if city.lower().startswith(query):
+        return 1
+    return 2
+
+
+class TrieNode:
+    __slots__ = ("children", "airport_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.airport_ids = []
+
+
+class AirportTrie:
+    """
+    Prefix trie over the words of airport names and cities.
+
+    Airports are inserted from the most to the least routes, so every node
+    lists all airports with a word starting with its prefix in that order. A
+    lookup walks at most depth characters per query word and filters the
+    airports of the most selective node.
+    """
+
+    def __init__(self, depth=6):
+        self.depth = depth
+        self.version = None
+        self.root = TrieNode()
+        self.airports = {}
+
+    def refresh(self):
+        version = airport_search_version()
+        if version == self.version:
+            return self
+
+        route_counts = Counter()
+        for source_id, destination_id in Route.objects.values_list("source_id", "destination_id"):
+            route_counts[source_id] += 1
+            route_counts[destination_id] += 1
+
+        self.build(
+            (airport_id, name, city, route_counts[airport_id])
+            for airport_id, name, city in Airport.objects.values_list(
+                "id", "name", "closest_big_city"
+            )
+        )
+        self.version = version
+        return self
+
+    def build(self, airports):
+        """Index (id, name, closest_big_city, route_count) rows"""
+        self.root = TrieNode()
+        self.airports = {
+            row[0]: dict(zip(SUGGEST_FIELDS, row))
+            for row in sorted(airports, key=lambda row: (-row[3], row[1]))
+        }
+
+        for airport_id, airport in self.airports.items():
+            for word in set(words(airport["name"]) + words(airport["closest_big_city"])):
+                node = self.root
+                for char in word[:self.depth]:
+                    node = node.children.setdefault(char, TrieNode())
+                    if not node.airport_ids or node.airport_ids[-1] != airport_id:
+                        node.airport_ids.append(airport_id)
+        return self
+
+    def search(self, query, limit):
+        query_words = words(query)
+        if not query_words:
+            return []
+
+        nodes = []
+        for query_word in query_words:
+            node = self.root
+            for char in query_word[:self.depth]:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            nodes.append(node)
+
+        # candidates of the smallest node are checked against the other words,
+        # and against the characters past depth of its own
+        candidates = min(nodes, key=lambda node: len(node.airport_ids)).airport_ids
+        query = " ".join(query_words)
+        ranked = ([], [], [])
+        for airport_id in candidates:
+            airport = self.airports[airport_id]
+            airport_words = words(airport["name"]) + words(airport["closest_big_city"])
+            if not all(
+                any(word.startswith(query_word) for word in airport_words)
+                for query_word in query_words
+            ):
+                continue
+            rank = ranked[match_rank(query, airport["name"], airport["closest_big_city"])]
+            rank.append(airport)
+            # candidates come by route count, later ones cannot beat the best rank
+            if rank is ranked[0] and len(rank) == limit:
+                break
+
+        return [airport for rank in ranked for airport in rank][:limit]
+
+
+airport_trie = AirportTrie()
+
+
+def route_count_subquery():
+    # one aggregate over both ends, served by the source and destination indexes
+    return Subquery(
+        Route.objects.filter(Q(source=OuterRef("pk")) | Q(destination=OuterRef("pk")))
+        .order_by()
+        .annotate(count=Func("pk", function="COUNT"))
+        .values("count"),
+        output_field=IntegerField(),
+    )
+
+
+def word_prefix(field, word):
+    # the prefix btree serves the first word, the trigram index the later ones
+    return Q(**{f"{field}__istartswith": word}) | Q(**{f"{field}__icontains": f" {word}"})
+
+
+def database_search(query, limit):
+    query_words = words(query)
+    condition = Q()
+    for word in query_words:
+        condition &= word_prefix("name", word) | word_prefix("closest_big_city", word)
+    query = " ".join(query_words)
+
+    return list(
+        Airport.objects.filter(condition)
+        .annotate(
+            route_count=route_count_subquery(),
+            match_rank=Case(
+                When(name__istartswith=query, then=Value(0)),
+                When(closest_big_city__istartswith=query, then=Value(1)),
+                default=Value(2),
+            ),
+        )
+        .order_by("match_rank", "-route_count", "name")
+        .values(*SUGGEST_FIELDS)[:limit]
+    )
+
+
+def suggest_airports(query, limit):
+    """Best airports whose name or closest big city matches the typed query"""
+    if connection.vendor == "postgresql":
+        return database_search(query, limit)
+    return airport_trie.refresh().search(query, limit)
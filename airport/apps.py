@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AirportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'airport'
+
+    def ready(self):
+        from airport import signals  # noqa: F401
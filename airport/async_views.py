@@ -0,0 +1,158 @@
+"""
+Async read endpoints for flight search, flight detail and seat availability.
+
+They use the async ORM and the .values() serialization from
+airport.fast_serializers, so under ASGI (see airport_service/asgi.py) a slow
+client waits on the event loop instead of holding a worker thread.
+Availability comes from the flight's seat map rather than a ticket count,
+and from the capacity and sold seats of its search index in the search.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils import timezone
+from django.db.models import F
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+
+from airport.fast_serializers import (
+    FLIGHT_VALUES,
+    aget_crew_names,
+    flight_data,
+    seat_map_data,
+)
+from airport.models import Flight
+from airport.seat_map import SeatMap
+from airport.throttling import SlidingWindowRateThrottle
+
+
+class SearchRateThrottle(SlidingWindowRateThrottle):
+    """The "search" rate per client address, for views outside DRF."""
+    scope = "search"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+async def throttled(request):
+    throttle = SearchRateThrottle()
+    if await sync_to_async(throttle.allow_request)(request, None):
+        return None
+
+    response = JsonResponse({"detail": "Request was throttled."}, status=429)
+    wait = throttle.wait()
+    if wait is not None:
+        response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+def not_found():
+    return JsonResponse({"detail": "No Flight matches the given query."}, status=404)
+
+
+def get_int_param(params, name, default=None):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "must be an integer"})
+
+
+def get_seat_map(values):
+    return SeatMap(values["airplane__rows"], values["airplane__seats_in_row"], values["seat_map"])
+
+
+def search_queryset(params):
+    queryset = Flight.objects.order_by("departure_time", "id")
+
+    source_id = get_int_param(params, "from")
+    if source_id is not None:
+        queryset = queryset.filter(route__source_id=source_id)
+    destination_id = get_int_param(params, "to")
+    if destination_id is not None:
+        queryset = queryset.filter(route__destination_id=destination_id)
+
+    if params.get("date"):
+        try:
+            date = parse_date(params["date"])
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError({"date": "must be a date in YYYY-MM-DD format"})
+        queryset = queryset.filter(departure_time__date=date)
+    else:
+        queryset = queryset.filter(departure_time__gte=timezone.now())
+
+    queryset = queryset.annotate(
+        tickets_available=F("search_index__capacity") - F("search_index__sold")
+    )
+    min_available = get_int_param(params, "min_available")
+    if min_available is not None:
+        queryset = queryset.filter(tickets_available__gte=min_available)
+
+    return queryset.values(*FLIGHT_VALUES, "tickets_available")
+
+
+@require_GET
+async def flight_search(request):
+    """
+    Upcoming flights, optionally filtered by ?from=&to= airport ids, ?date=
+    and ?min_available= seats, at most ?limit= of them.
+    """
+    response = await throttled(request)
+    if response is not None:
+        return response
+
+    try:
+        queryset = search_queryset(request.GET)
+        limit = get_int_param(request.GET, "limit", settings.CURSOR_PAGINATION_PAGE_SIZE)
+    except ValidationError as error:
+        return JsonResponse(error.message_dict, status=400)
+    limit = min(max(limit, 1), settings.CURSOR_PAGINATION_MAX_PAGE_SIZE)
+
+    rows = [values async for values in queryset[:limit]]
+
+    crew = await aget_crew_names({values["id"] for values in rows})
+    data = []
+    for values in rows:
+        flight = flight_data(values["id"], values, crew)
+        flight["tickets_available"] = values["tickets_available"]
+        data.append(flight)
+    return JsonResponse(data, safe=False)
+
+
+@require_GET
+async def flight_detail(request, pk):
+    response = await throttled(request)
+    if response is not None:
+        return response
+
+    try:
+        values = await Flight.objects.values(*FLIGHT_VALUES, "seat_map").aget(pk=pk)
+    except Flight.DoesNotExist:
+        return not_found()
+
+    flight = flight_data(pk, values, await aget_crew_names([pk]))
+    flight["tickets_available"] = get_seat_map(values).available_count
+    return JsonResponse(flight)
+
+
+@require_GET
+async def flight_seats(request, pk):
+    response = await throttled(request)
+    if response is not None:
+        return response
+
+    try:
+        values = await Flight.objects.values(
+            "seat_map", "airplane__rows", "airplane__seats_in_row"
+        ).aget(pk=pk)
+    except Flight.DoesNotExist:
+        return not_found()
+
+    return JsonResponse(seat_map_data(pk, get_seat_map(values)))
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CACHED_VIEWS = []
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def generation_key(model):
+    return f"response-cache:generation:{model._meta.label_lower}"
+
+
+def invalidate_model(model):
+    response_cache().set(generation_key(model), uuid.uuid4().hex, None)
+
+
+def stats_key(view_name, outcome):
+    return f"response-cache:stats:{view_name}:{outcome}"
+
+
+def record(view_name, outcome):
+    cache = response_cache()
+    key = stats_key(view_name, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats():
+    cache = response_cache()
+    keys = {
+        stats_key(view_name, outcome): (view_name, outcome)
+        for view_name in CACHED_VIEWS
+        for outcome in ("hits", "misses")
+    }
+    counters = cache.get_many(keys)
+
+    stats = {view_name: {"hits": 0, "misses": 0} for view_name in CACHED_VIEWS}
+    for key, value in counters.items():
+        view_name, outcome = keys[key]
+        stats[view_name][outcome] = value
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Caches rendered JSON of list and retrieve responses.
+
+    Entries are keyed by action, URL kwargs, query params and user scope, and
+    by the current generation of every model in cache_models. Saving or
+    deleting one of those models starts a new generation (see airport.signals).
+    """
+    cache_models = ()
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        CACHED_VIEWS.append(cls.__name__)
+
+    def get_cache_scope(self, request):
+        user = request.user
+        if user and user.is_staff:
+            return "staff"
+        if user and user.is_authenticated:
+            return f"user:{user.id}"
+        return "anon"
+
+    def get_cache_key(self, request):
+        cache = response_cache()
+        keys = [generation_key(model) for model in self.cache_models]
+        generations = cache.get_many(keys)
+        for key in keys:
+            if key not in generations:
+                generations[key] = uuid.uuid4().hex
+                if not cache.add(key, generations[key], None):
+                    generations[key] = cache.get(key)
+
+        raw = json.dumps(
+            [
+                type(self).__name__,
+                self.action,
+                self.kwargs,
+                sorted(request.query_params.lists()),
+                self.get_cache_scope(request),
+                [generations[key] for key in keys],
+            ],
+            default=str,
+        )
+        return "response-cache:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+
+        view_name = type(self).__name__
+        key = self.get_cache_key(request)
+        cached = response_cache().get(key)
+        if cached is not None:
+            record(view_name, "hits")
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        record(view_name, "misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            self._response_cache_key = key
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        key = getattr(self, "_response_cache_key", None)
+        if key is not None and isinstance(response, Response):
+            response.render()
+            response_cache().set(
+                key, (response.content, response["Content-Type"]), self.cache_timeout
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified to list and retrieve responses.
+
+    The validators come from one aggregate over the filtered queryset
+    (row count and latest version_fields), so a request with a matching
+    If-None-Match is answered with 304 before any object is loaded.
+    """
+    version_fields = ("updated_at",)
+
+    def get_version(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        aggregates = {
+            f"version_{index}": Max(field) for index, field in enumerate(self.version_fields)
+        }
+        return queryset.order_by().aggregate(count=Count("pk"), **aggregates)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version = self.get_version()
+        timestamps = [
+            value for key, value in version.items() if key != "count" and value is not None
+        ]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        raw = json.dumps([request.get_full_path(), sorted(version.items())], default=str)
+        etag = '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
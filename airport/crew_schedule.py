@@ -0,0 +1,161 @@
+"""
+Crew availability on top of CrewAssignment intervals.
+
+On PostgreSQL a conflict check is one query on the GiST index behind the
+crew_assignment_no_overlap exclusion constraint. Other backends (SQLite in
+tests) use CrewIntervalIndex, an in-process copy of the intervals that is
+rebuilt when assignments change.
+"""
+import uuid
+from bisect import bisect_right
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import BooleanField, F, Field, Func, Value
+
+from airport.models import CrewAssignment
+
+CREW_SCHEDULE_VERSION_KEY = "crew-schedule-version"
+
+
+def crew_schedule_version():
+    return cache.get_or_set(CREW_SCHEDULE_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_crew_schedule_version():
+    cache.set(CREW_SCHEDULE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+class TimeRange(Func):
+    function = "tstzrange"
+    output_field = Field()
+
+
+class Overlaps(Func):
+    arg_joiner = " && "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+class CrewIntervalIndex:
+    """
+    Assignments of every crew member sorted by start.
+
+    The intervals of one person do not overlap, so they are sorted by end as
+    well, and the only candidate for a conflict is found with one bisect.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.intervals = {}
+
+    def refresh(self):
+        version = crew_schedule_version()
+        if version == self.version:
+            return self
+
+        self.load(
+            CrewAssignment.objects.order_by("crew_id", "starts_at").values_list(
+                "crew_id", "flight_id", "starts_at", "ends_at"
+            )
+        )
+        self.version = version
+        return self
+
+    def load(self, assignments):
+        """Index (crew_id, flight_id, starts_at, ends_at) rows sorted by crew and start"""
+        self.intervals = {}
+        for crew_id, flight_id, starts_at, ends_at in assignments:
+            ends, rows = self.intervals.setdefault(crew_id, ([], []))
+            ends.append(ends_at)
+            rows.append((starts_at, flight_id))
+        return self
+
+    def add(self, crew_id, flight_id, starts_at, ends_at):
+        ends, rows = self.intervals.setdefault(crew_id, ([], []))
+        index = bisect_right(ends, ends_at)
+        ends.insert(index, ends_at)
+        rows.insert(index, (starts_at, flight_id))
+
+    def overlapping(self, crew_id, starts_at, ends_at, exclude_flight_id=None):
+        """(starts_at, flight_id) of an assignment of the crew member overlapping the interval"""
+        ends, rows = self.intervals.get(crew_id, ((), ()))
+        index = bisect_right(ends, starts_at)
+        while index < len(rows) and rows[index][0] < ends_at:
+            if rows[index][1] is None or rows[index][1] != exclude_flight_id:
+                return rows[index]
+            index += 1
+        return None
+
+
+crew_interval_index = CrewIntervalIndex()
+
+
+def overlapping_assignments(starts_at, ends_at):
+    if connection.vendor == "postgresql":
+        return CrewAssignment.objects.filter(
+            Overlaps(
+                TimeRange(F("starts_at"), F("ends_at")),
+                TimeRange(Value(starts_at), Value(ends_at)),
+            )
+        )
+    return CrewAssignment.objects.filter(starts_at__lt=ends_at, ends_at__gt=starts_at)
+
+
+def find_conflicts(crew_ids, starts_at, ends_at, exclude_flight_id=None):
+    """{crew_id: flight_id} of the crew already assigned to a flight in that interval"""
+    if connection.vendor == "postgresql":
+        assignments = overlapping_assignments(starts_at, ends_at).filter(crew_id__in=crew_ids)
+        if exclude_flight_id is not None:
+            assignments = assignments.exclude(flight_id=exclude_flight_id)
+        return dict(assignments.values_list("crew_id", "flight_id"))
+
+    index = crew_interval_index.refresh()
+    conflicts = {}
+    for crew_id in crew_ids:
+        assignment = index.overlapping(crew_id, starts_at, ends_at, exclude_flight_id)
+        if assignment is not None:
+            conflicts[crew_id] = assignment[1]
+    return conflicts
+
+
+def busy_crew(starts_at, ends_at):
+    """Ids of crew assigned to any flight in the interval, as a subquery or a set"""
+    if connection.vendor == "postgresql":
+        return overlapping_assignments(starts_at, ends_at).values("crew_id")
+
+    index = crew_interval_index.refresh()
+    return {
+        crew_id
+        for crew_id in index.intervals
+        if index.overlapping(crew_id, starts_at, ends_at) is not None
+    }
+
+
+def assign_crew(flights, crew_by_flight):
+    """Create assignments for {flight_id: crew_ids} of the given Flight objects"""
+    CrewAssignment.objects.bulk_create(
+        [
+            CrewAssignment(
+                crew_id=crew_id,
+                flight_id=flight.id,
+                starts_at=flight.departure_time,
+                ends_at=flight.arrival_time,
+            )
+            for flight in flights
+            for crew_id in crew_by_flight.get(flight.id, ())
+        ]
+    )
+    bump_crew_schedule_version()
+
+
+def unassign_crew(**filters):
+    CrewAssignment.objects.filter(**filters).delete()
+    bump_crew_schedule_version()
+
+
+def reschedule_crew(flight):
+    if CrewAssignment.objects.filter(flight=flight).exclude(
+        starts_at=flight.departure_time, ends_at=flight.arrival_time
+    ).update(starts_at=flight.departure_time, ends_at=flight.arrival_time):
+        bump_crew_schedule_version()
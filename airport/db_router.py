@@ -0,0 +1,141 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils.functional import LazyObject
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULT_DB = "default"
+
+_current_request = ContextVar("db_router_request", default=None)
+_use_primary = ContextVar("db_router_use_primary", default=False)
+
+
+def pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def pin_user(user_id):
+    """Send the user's reads to the primary until replicas have caught up."""
+    cache.set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def use_primary():
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def primary_pinned():
+    # a transaction reads its own uncommitted rows only on the primary
+    if _use_primary.get() or connections[DEFAULT_DB].in_atomic_block:
+        return True
+
+    request = _current_request.get()
+    if request is None:
+        return False
+    if request.method not in SAFE_METHODS:
+        return True
+
+    pinned = request.__dict__.get("_db_pinned")
+    if pinned is None:
+        # only the user set by DRF authentication counts, resolving the lazy
+        # session user here would itself run a query through the router
+        user = request.__dict__.get("user")
+        if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+            return False
+        pinned = request._db_pinned = bool(cache.get(pin_key(user.id)))
+    return pinned
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends the reads of a request to one random replica from DATABASE_REPLICAS
+    and writes to the primary. Reads stay on the primary for the whole of an
+    unsafe request, for REPLICA_PIN_SECONDS after a write by the same user,
+    inside a transaction on the primary and inside use_primary().
+    """
+
+    def __init__(self, replicas=None):
+        self.replicas = list(settings.DATABASE_REPLICAS if replicas is None else replicas)
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or primary_pinned():
+            return DEFAULT_DB
+
+        request = _current_request.get()
+        if request is None:
+            return random.choice(self.replicas)
+        # one replica per request, so its reads see one consistent snapshot
+        # and reuse a single connection
+        replica = request.__dict__.get("_db_replica")
+        if replica not in self.replicas:
+            replica = request._db_replica = random.choice(self.replicas)
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in self.replicas
+
+
+def written_by(request, response):
+    """Id of the authenticated user whose write request succeeded, if any"""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return None
+    user = request.__dict__.get("user")
+    if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+        return None
+    return user.id
+
+
+class PrimaryPinningMiddleware:
+    """Makes the request visible to the router and pins users after their writes."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        user_id = written_by(request, response)
+        if user_id is not None:
+            pin_user(user_id)
+        return response
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+        user_id = written_by(request, response)
+        if user_id is not None:
+            await cache.aset(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+        return response
@@ -0,0 +1,115 @@
+"""
+Read-only serialization of flight and ticket lists straight from .values() rows.
+
+The output matches FlightListSerializer and TicketListSerializer, but skips
+model instantiation and per-field to_representation calls.
+"""
+from rest_framework import serializers
+
+from airport.models import Flight
+
+FLIGHT_VALUES = (
+    "id",
+    "route__source__name",
+    "route__destination__name",
+    "airplane__id",
+    "airplane__name",
+    "airplane__rows",
+    "airplane__seats_in_row",
+    "airplane__airplane_type__name",
+    "departure_time",
+    "arrival_time",
+)
+
+TICKET_VALUES = ("id", "seat", "row", "flight_id") + tuple(
+    f"flight__{field}" for field in FLIGHT_VALUES[1:]
+)
+
+datetime_field = serializers.DateTimeField()
+
+
+def _crew_names_queryset(flight_ids):
+    return Flight.crew.through.objects.filter(
+        flight_id__in=flight_ids
+    ).order_by("pk").values_list("flight_id", "crew__first_name", "crew__last_name")
+
+
+def _group_crew_names(rows):
+    crew = {}
+    for flight_id, first_name, last_name in rows:
+        crew.setdefault(flight_id, []).append(f"{first_name} {last_name}")
+    return crew
+
+
+def get_crew_names(flight_ids):
+    return _group_crew_names(_crew_names_queryset(flight_ids))
+
+
+async def aget_crew_names(flight_ids):
+    return _group_crew_names([row async for row in _crew_names_queryset(flight_ids)])
+
+
+def flight_data(flight_id, values, crew, prefix=""):
+    rows = values[prefix + "airplane__rows"]
+    seats_in_row = values[prefix + "airplane__seats_in_row"]
+    capacity = rows * seats_in_row
+
+    return {
+        "id": flight_id,
+        "route_info": (
+            f"{values[prefix + 'route__source__name']} - "
+            f"{values[prefix + 'route__destination__name']}"
+        ),
+        "airplane": {
+            "id": values[prefix + "airplane__id"],
+            "name": values[prefix + "airplane__name"],
+            "rows": rows,
+            "seats_in_row": seats_in_row,
+            "capacity": capacity,
+            "is_small": "Yes" if capacity < 60 else "No",
+            "airplane_type": values[prefix + "airplane__airplane_type__name"],
+        },
+        "departure_time": datetime_field.to_representation(values[prefix + "departure_time"]),
+        "arrival_time": datetime_field.to_representation(values[prefix + "arrival_time"]),
+        "crew": crew.get(flight_id, []),
+    }
+
+
+def serialize_flights(rows, crew=None):
+    rows = list(rows)
+    if crew is None:
+        crew = get_crew_names({values["id"] for values in rows})
+
+    data = []
+    for values in rows:
+        flight = flight_data(values["id"], values, crew)
+        if "tickets_available" in values:
+            flight["tickets_available"] = values["tickets_available"]
+        data.append(flight)
+    return data
+
+
+def serialize_tickets(rows):
+    rows = list(rows)
+    crew = get_crew_names({values["flight_id"] for values in rows})
+
+    return [
+        {
+            "id": values["id"],
+            "seat": values["seat"],
+            "row": values["row"],
+            "flight": flight_data(values["flight_id"], values, crew, prefix="flight__"),
+        }
+        for values in rows
+    ]
+
+
+def seat_map_data(flight_id, seat_map):
+    return {
+        "flight": flight_id,
+        "rows": seat_map.rows,
+        "seats_in_row": seat_map.seats_in_row,
+        "capacity": seat_map.capacity,
+        "available": seat_map.available_count,
+        "seats": seat_map.as_rows(),
+    }
@@ -0,0 +1,135 @@
+import heapq
+import uuid
+from bisect import bisect_left
+from collections import defaultdict, deque
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from airport.models import Flight, Route
+
+ROUTE_INDEX_VERSION_KEY = "route-index-version"
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def route_index_version():
+    return cache.get_or_set(ROUTE_INDEX_VERSION_KEY, new_version, None)
+
+
+def bump_route_index_version():
+    cache.set(ROUTE_INDEX_VERSION_KEY, new_version(), None)
+
+
+class RouteIndex:
+    """In-memory adjacency index of the route graph, rebuilt when routes change."""
+
+    def __init__(self):
+        self.version = None
+        self.incoming = {}
+
+    def refresh(self):
+        version = route_index_version()
+        if version == self.version:
+            return self
+
+        incoming = defaultdict(set)
+        for source_id, destination_id in Route.objects.values_list("source_id", "destination_id"):
+            incoming[destination_id].add(source_id)
+
+        self.incoming = dict(incoming)
+        self.version = version
+        return self
+
+    def hops_to(self, destination_id, max_hops):
+        """Fewest legs needed to reach the destination from every airport within max_hops."""
+        hops = {destination_id: 0}
+        queue = deque([destination_id])
+
+        while queue:
+            airport_id = queue.popleft()
+            if hops[airport_id] == max_hops:
+                continue
+            for source_id in self.incoming.get(airport_id, ()):
+                if source_id not in hops:
+                    hops[source_id] = hops[airport_id] + 1
+                    queue.append(source_id)
+
+        return hops
+
+
+route_index = RouteIndex()
+
+
+def find_itineraries(source_id, destination_id, date, max_legs, limit):
+    """
+    Earliest-arrival itineraries from source to destination leaving on the given date.
+
+    Returns lists of flight ids. Connections respect ITINERARY_MIN_CONNECTION_MINUTES
+    and every flight needed for the search is loaded with a single query.
+    """
+    hops = route_index.refresh().hops_to(destination_id, max_legs)
+    if source_id == destination_id or source_id not in hops:
+        return []
+
+    day_start = timezone.make_aware(datetime.combine(date, time.min))
+    day_end = day_start + timedelta(days=1)
+    min_connection = timedelta(minutes=settings.ITINERARY_MIN_CONNECTION_MINUTES)
+
+    departures = defaultdict(list)
+    flights = Flight.objects.filter(
+        route__source_id__in=[airport_id for airport_id in hops if airport_id != destination_id],
+        route__destination_id__in=list(hops),
+        departure_time__gte=day_start,
+        departure_time__lt=day_start + timedelta(hours=settings.ITINERARY_MAX_DURATION_HOURS),
+    ).values_list(
+        "departure_time", "arrival_time", "route__source_id", "route__destination_id", "id"
+    ).order_by("departure_time")
+
+    for departure_time, arrival_time, from_id, to_id, flight_id in flights:
+        departures[from_id].append((departure_time, arrival_time, to_id, flight_id))
+
+    departure_times = {
+        airport_id: [flight[0] for flight in airport_flights]
+        for airport_id, airport_flights in departures.items()
+    }
+
+    queue = []
+    for departure_time, arrival_time, to_id, flight_id in departures[source_id]:
+        if departure_time >= day_end:
+            break
+        if hops.get(to_id, max_legs) < max_legs:
+            queue.append((arrival_time, departure_time, (flight_id,), (source_id, to_id)))
+    heapq.heapify(queue)
+
+    itineraries = []
+    settled = defaultdict(int)
+
+    while queue and len(itineraries) < limit:
+        arrival_time, departure_time, legs, airports = heapq.heappop(queue)
+        airport_id = airports[-1]
+
+        if airport_id == destination_id:
+            itineraries.append(list(legs))
+            continue
+
+        settled[airport_id] += 1
+        if settled[airport_id] > limit:
+            continue
+
+        remaining_legs = max_legs - len(legs)
+        start = bisect_left(departure_times.get(airport_id, []), arrival_time + min_connection)
+
+        for next_departure, next_arrival, to_id, flight_id in departures[airport_id][start:]:
+            if to_id in airports or hops.get(to_id, max_legs) >= remaining_legs:
+                continue
+            heapq.heappush(
+                queue,
+                (next_arrival, departure_time, legs + (flight_id,), airports + (to_id,)),
+            )
+
+    return itineraries
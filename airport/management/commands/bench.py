@@ -0,0 +1,230 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from contextlib import ExitStack
+from unittest import mock
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.db_router import use_primary
+from airport.metrics import QueryTimer
+from airport.models import Flight
+from airport.synthetic import CITIES, SyntheticDataset
+from airport.throttling import SlidingWindowRateThrottle
+
+ENDPOINTS = ("flights_list", "flight_detail", "orders_create", "orders_list", "tickets_list")
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset into a throwaway test database, drive the API routes "
+        "in-process with the DRF test client and report requests/sec, p50/p95/p99 latency "
+        "and SQL queries per request for every endpoint. --output writes the results as "
+        "JSON to compare runs between versions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--airports", type=int, default=40)
+        parser.add_argument("--airplanes", type=int, default=20)
+        parser.add_argument("--flights", type=int, default=500)
+        parser.add_argument("--load-factor", type=float, default=0.8)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+        parser.add_argument("--output", help="Path of the JSON report")
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Use the configured database inside a transaction that is rolled back",
+        )
+
+    def handle(self, *args, **options):
+        if options["current_db"]:
+            try:
+                with use_primary(), transaction.atomic():
+                    report = self.benchmark(options)
+                    raise Rollback
+            except Rollback:
+                pass
+        else:
+            setup_test_environment(debug=False)
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with use_primary():
+                    report = self.benchmark(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        self.stdout.write(
+            f"{'endpoint':<16}{'requests':>10}{'req/s':>10}{'p50, ms':>10}"
+            f"{'p95, ms':>10}{'p99, ms':>10}{'queries':>10}{'errors':>8}"
+        )
+        for name, result in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<16}{result['requests']:>10}{result['requests_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries_per_request']:>10.1f}{result['errors']:>8}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def benchmark(self, options):
+        started = time.perf_counter()
+        # unique names per run, --current-db may already hold a dataset
+        namespace = f"bench-{uuid.uuid4().hex[:8]}-"
+        last_flight_id = Flight.objects.aggregate(last=Max("id"))["last"] or 0
+        dataset = SyntheticDataset(
+            seed=options["seed"],
+            airports=options["airports"],
+            airplanes=options["airplanes"],
+            flights=options["flights"],
+            load_factor=options["load_factor"],
+            namespace=namespace,
+        )
+        rows = dataset.create()
+        self.stdout.write(
+            f"Seeded {rows['flights']} flights and {rows['tickets']} tickets "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        self.rng = random.Random(options["seed"])
+        self.customer = get_user_model().objects.create_user(username=f"{namespace}customer")
+        self.admin = get_user_model().objects.create_superuser(username=f"{namespace}admin")
+        self.flights = Flight.objects.filter(id__gt=last_flight_id)
+        self.flight_ids = list(self.flights.values_list("id", flat=True))
+        self.free_seats = self.get_free_seats()
+
+        results = {}
+        # benchmark traffic would otherwise be throttled after a few requests
+        with mock.patch.object(SlidingWindowRateThrottle, "get_rate", return_value=None):
+            for name in options["endpoints"]:
+                results[name] = self.run(name, options["requests"], options["warmup"])
+
+        return {
+            "created_at": timezone.now().isoformat(),
+            "revision": self.get_revision(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "seed": options["seed"],
+            "dataset": rows,
+            "endpoints": results,
+        }
+
+    def get_free_seats(self):
+        free = []
+        for flight in self.flights.select_related("airplane").only(
+            "seat_map", "airplane__rows", "airplane__seats_in_row"
+        ):
+            seat_map = flight.get_seat_map()
+            free.extend(
+                (flight.id, row, seat)
+                for row in range(1, seat_map.rows + 1)
+                for seat in range(1, seat_map.seats_in_row + 1)
+                if not seat_map.is_taken(row, seat)
+            )
+        self.rng.shuffle(free)
+        return free
+
+    def next_request(self, name):
+        """(client user, method, url, data) of one request to the endpoint"""
+        if name == "flights_list":
+            return self.customer, "get", reverse("airport:flights-list"), {
+                "search": self.rng.choice(CITIES)
+            }
+        if name == "flight_detail":
+            flight_id = self.rng.choice(self.flight_ids)
+            return self.customer, "get", reverse("airport:flights-detail", args=[flight_id]), {}
+        if name == "orders_create":
+            flight_id, row, seat = self.free_seats.pop()
+            return self.customer, "post", reverse("airport:orders-list"), {
+                "tickets": [{"flight": flight_id, "row": row, "seat": seat}]
+            }
+        if name == "orders_list":
+            return self.customer, "get", reverse("airport:orders-list"), {}
+        return self.admin, "get", reverse("airport:tickets-list"), {
+            "search": self.rng.choice(CITIES)
+        }
+
+    def run(self, name, requests, warmup):
+        clients = {}
+        latencies, queries, errors = [], [], 0
+        total = 0.0
+
+        for index in range(warmup + requests):
+            user, method, url, data = self.next_request(name)
+            client = clients.get(user.id)
+            if client is None:
+                client = clients[user.id] = APIClient()
+                client.force_authenticate(user)
+
+            timer = QueryTimer()
+            with ExitStack() as stack:
+                for database in connections.all():
+                    stack.enter_context(database.execute_wrapper(timer))
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data, format="json")
+                seconds = time.perf_counter() - started
+
+            if index < warmup:
+                continue
+            total += seconds
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(seconds)
+            queries.append(timer.count)
+
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        else:
+            percentiles = (latencies or [0.0]) * 99
+        return {
+            "requests": requests,
+            "errors": errors,
+            "requests_per_second": round(requests / total, 1) if total else 0.0,
+            "p50_ms": round(percentiles[49] * 1000, 3),
+            "p95_ms": round(percentiles[94] * 1000, 3),
+            "p99_ms": round(percentiles[98] * 1000, 3),
+            "queries_per_request": round(statistics.fmean(queries), 2) if queries else 0.0,
+        }
+
+    @staticmethod
+    def get_revision():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
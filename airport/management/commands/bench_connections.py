@@ -0,0 +1,87 @@
+import io
+import threading
+import time
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from airport.throttling import SlidingWindowRateThrottle
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/sec of an endpoint with a new database connection per request "
+        "(CONN_MAX_AGE=0) and with persistent connections. Requests go through the WSGI "
+        "handler in-process, so connections are opened and closed as under a real server. "
+        "Run it against the configured PostgreSQL database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/airport/flights/")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--max-age", type=int, default=60)
+
+    def handle(self, *args, **options):
+        handler = WSGIHandler()
+        database = connections.settings["default"]
+        original = database["CONN_MAX_AGE"], database["CONN_HEALTH_CHECKS"]
+
+        self.stdout.write(f"{'mode':<14}{'requests':>10}{'seconds':>10}{'req/s':>10}")
+        # benchmark traffic would otherwise be throttled after a few requests
+        with mock.patch.object(SlidingWindowRateThrottle, "get_rate", return_value=None):
+            try:
+                for mode, max_age, health_checks in (
+                    ("per-request", 0, False),
+                    ("persistent", options["max_age"], True),
+                ):
+                    database["CONN_MAX_AGE"] = max_age
+                    database["CONN_HEALTH_CHECKS"] = health_checks
+                    connections.close_all()
+                    seconds = self.run(handler, options)
+                    self.stdout.write(
+                        f"{mode:<14}{options['requests']:>10}{seconds:>10.2f}"
+                        f"{options['requests'] / seconds:>10.1f}"
+                    )
+            finally:
+                database["CONN_MAX_AGE"], database["CONN_HEALTH_CHECKS"] = original
+
+    def run(self, handler, options):
+        per_worker, extra = divmod(options["requests"], options["concurrency"])
+        errors = []
+        workers = [
+            threading.Thread(
+                target=self.worker,
+                args=(handler, options["path"], per_worker + (index < extra), errors),
+            )
+            for index in range(options["concurrency"])
+        ]
+
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds = time.perf_counter() - started
+
+        if errors:
+            self.stderr.write(f"{len(errors)} requests failed, first status: {errors[0]}")
+        return seconds
+
+    @staticmethod
+    def worker(handler, path, count, errors):
+        path, _, query = path.partition("?")
+        for _ in range(count):
+            environ = {"PATH_INFO": path, "QUERY_STRING": query, "wsgi.input": io.BytesIO()}
+            setup_testing_defaults(environ)
+            statuses = []
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            for _ in response:
+                pass
+            response.close()
+            if not statuses[0].startswith("200"):
+                errors.append(statuses[0])
+        connections.close_all()
@@ -0,0 +1,72 @@
+import io
+import time
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from airport.metrics import registry
+from airport.throttling import SlidingWindowRateThrottle
+
+METRICS_MIDDLEWARE = "airport.metrics.MetricsMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of MetricsMiddleware: the same endpoint is "
+        "served in-process through the WSGI handler with and without it, in alternating "
+        "rounds, and the best round of each is compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/airport/flights/")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with_metrics = WSGIHandler()
+        with override_settings(
+            MIDDLEWARE=[name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE]
+        ):
+            without_metrics = WSGIHandler()
+
+        best = {"without": float("inf"), "with": float("inf")}
+        # benchmark traffic would otherwise be throttled after a few requests
+        with mock.patch.object(SlidingWindowRateThrottle, "get_rate", return_value=None):
+            self.run(without_metrics, options["path"], 20)
+            self.run(with_metrics, options["path"], 20)
+            for _ in range(options["rounds"]):
+                for mode, handler in (("without", without_metrics), ("with", with_metrics)):
+                    seconds = self.run(handler, options["path"], options["requests"])
+                    best[mode] = min(best[mode], seconds / options["requests"])
+        registry.reset()
+
+        overhead = best["with"] - best["without"]
+        self.stdout.write(f"{'middleware':<12}{'ms/request':>12}{'req/s':>10}")
+        for mode in ("without", "with"):
+            self.stdout.write(
+                f"{mode:<12}{best[mode] * 1000:>12.3f}{1 / best[mode]:>10.1f}"
+            )
+        self.stdout.write(
+            f"overhead: {overhead * 1e6:.1f} us/request "
+            f"({overhead / best['without'] * 100:.2f}%)"
+        )
+
+    def run(self, handler, path, count):
+        path, _, query = path.partition("?")
+        started = time.perf_counter()
+        for _ in range(count):
+            environ = {"PATH_INFO": path, "QUERY_STRING": query, "wsgi.input": io.BytesIO()}
+            setup_testing_defaults(environ)
+            statuses = []
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            for _ in response:
+                pass
+            response.close()
+            if not statuses[0].startswith("200"):
+                self.stderr.write(f"request failed: {statuses[0]}")
+                break
+        return time.perf_counter() - started
@@ -0,0 +1,125 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from airport.fast_serializers import (
+    FLIGHT_VALUES,
+    TICKET_VALUES,
+    serialize_flights,
+    serialize_tickets,
+)
+from airport.models import Airplane, AirplaneType, Airport, Crew, Flight, Order, Route, Ticket
+from airport.serializers import FlightListSerializer, TicketListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF serializers with the fast .values() path for flight and ticket lists. "
+        "Benchmark data is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'list':<10}{'rows':>8}{'serializer, s':>16}{'fast, s':>12}{'speedup':>10}"
+        )
+
+        for rows in options["rows"]:
+            with transaction.atomic():
+                self.create_rows(rows)
+                flights = Flight.objects.select_related(
+                    "route__source", "route__destination", "airplane__airplane_type"
+                ).prefetch_related("crew").annotate(
+                    tickets_available=(
+                        F("airplane__rows") * F("airplane__seats_in_row") - Count("tickets")
+                    )
+                )
+                tickets = Ticket.objects.select_related(
+                    "flight__route__source",
+                    "flight__route__destination",
+                    "flight__airplane__airplane_type",
+                ).prefetch_related("flight__crew")
+
+                self.report(
+                    "flights",
+                    rows,
+                    lambda: FlightListSerializer(flights.all(), many=True).data,
+                    lambda: serialize_flights(
+                        flights.all().prefetch_related(None).values(
+                            *FLIGHT_VALUES, "tickets_available"
+                        )
+                    ),
+                    options["repeat"],
+                )
+                self.report(
+                    "tickets",
+                    rows,
+                    lambda: TicketListSerializer(tickets.all(), many=True).data,
+                    lambda: serialize_tickets(
+                        tickets.all().prefetch_related(None).values(*TICKET_VALUES)
+                    ),
+                    options["repeat"],
+                )
+                transaction.set_rollback(True)
+
+    def report(self, name, rows, slow, fast, repeat):
+        slow_time = self.best_of(slow, repeat)
+        fast_time = self.best_of(fast, repeat)
+        self.stdout.write(
+            f"{name:<10}{rows:>8}{slow_time:>16.3f}{fast_time:>12.3f}"
+            f"{slow_time / fast_time:>9.1f}x"
+        )
+
+    @staticmethod
+    def best_of(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    @staticmethod
+    def create_rows(rows):
+        user = get_user_model().objects.create_user(
+            username="bench-serializers", password="bench-serializers"
+        )
+        airplane_type = AirplaneType.objects.create(name="Bench type")
+        airplane = Airplane.objects.create(
+            name="Bench airplane", rows=rows, seats_in_row=1, airplane_type=airplane_type
+        )
+        source = Airport.objects.create(name="Bench source", closest_big_city="Bench")
+        destination = Airport.objects.create(name="Bench destination", closest_big_city="Bench")
+        route = Route.objects.create(source=source, destination=destination, distance=100)
+        crew = Crew.objects.bulk_create(
+            Crew(first_name="Bench", last_name=f"Crew {index}") for index in range(3)
+        )
+        order = Order.objects.create(user=user)
+
+        now = timezone.now()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=now + timedelta(minutes=index),
+                arrival_time=now + timedelta(minutes=index + 60),
+            )
+            for index in range(rows)
+        )
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+            for flight in flights
+            for member in crew
+        )
+        Ticket.objects.bulk_create(
+            Ticket(row=index + 1, seat=1, flight=flights[index], order=order)
+            for index in range(rows)
+        )
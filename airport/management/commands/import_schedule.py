@@ -0,0 +1,40 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.db_router import use_primary
+from airport.schedule_import import ScheduleImporter, read_schedule
+
+
+class Command(BaseCommand):
+    help = "Import flights from a CSV or JSONL schedule file, or from stdin with '-'"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", dest="file_format", choices=["csv", "jsonl"])
+        parser.add_argument("--chunk-size", type=int, default=settings.SCHEDULE_IMPORT_CHUNK_SIZE)
+        parser.add_argument("--show-errors", type=int, default=20)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or path.rsplit(".", 1)[-1].lower()
+        if file_format not in ("csv", "jsonl", "json"):
+            raise CommandError("Cannot infer the schedule format, pass --format")
+
+        importer = ScheduleImporter(options["chunk_size"])
+        # the importer reads back the rows it has just written
+        with use_primary():
+            if path == "-":
+                report = importer.run(read_schedule(sys.stdin, file_format))
+            else:
+                with open(path, encoding="utf-8", newline="") as stream:
+                    report = importer.run(read_schedule(stream, file_format))
+
+        self.stdout.write(
+            f"{report['rows']} rows, {report['created']} flights created, "
+            f"{len(report['errors'])} errors in {report['seconds']}s "
+            f"({report['rows_per_second']} rows/sec)"
+        )
+        for error in report["errors"][:options["show_errors"]]:
+            self.stdout.write(f"line {error['line']}: {error['errors']}")
@@ -0,0 +1,80 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Send GET requests to running servers with many concurrent connections and "
+        "report requests/sec and latency per URL, e.g. to compare a WSGI and an ASGI "
+        "deployment of the same endpoint. Run the servers with THROTTLE_RATE_ANON, "
+        "THROTTLE_RATE_USER and THROTTLE_RATE_SEARCH set to empty values."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'url':<50}{'req/s':>10}{'p50, ms':>10}{'p99, ms':>10}{'errors':>8}"
+        )
+        for url in options["urls"]:
+            seconds, latencies, errors = asyncio.run(
+                self.run(url, options["requests"], options["concurrency"], options["timeout"])
+            )
+            if latencies:
+                percentiles = statistics.quantiles(latencies, n=100)
+                p50, p99 = percentiles[49] * 1000, percentiles[98] * 1000
+            else:
+                p50 = p99 = float("nan")
+            self.stdout.write(
+                f"{url:<50}{len(latencies) / seconds:>10.1f}{p50:>10.1f}{p99:>10.1f}{errors:>8}"
+            )
+
+    async def run(self, url, requests, concurrency, timeout):
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def send():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(
+                        self.get(parts.hostname, parts.port or 80, parts.netloc, path), timeout
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                    status = None
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send() for _ in range(requests)))
+        return time.perf_counter() - started, latencies, errors
+
+    @staticmethod
+    async def get(host, port, netloc, path):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {netloc}\r\nConnection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            await reader.read()
+        finally:
+            writer.close()
+        return int(status_line.split()[1])
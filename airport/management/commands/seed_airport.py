@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from airport.db_router import use_primary
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.synthetic import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with a synthetic hub-and-spoke network, flights and "
+        "tickets, written with bulk_create in chunks. The same --seed and --start give "
+        "the same data. About 160 tickets are sold per flight at the default load factor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--airports", type=int, default=40)
+        parser.add_argument("--hubs", type=int, help="Default: one airport in eight")
+        parser.add_argument("--airplanes", type=int, default=200)
+        parser.add_argument("--flights", type=int, default=7500)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--load-factor", type=float, default=0.8)
+        parser.add_argument(
+            "--start",
+            type=datetime.fromisoformat,
+            help="Date of the first departures, default: tomorrow",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--flights-per-chunk", type=int, default=500)
+
+    def handle(self, *args, **options):
+        seeded = [
+            model._meta.verbose_name_plural
+            for model in (Airport, AirplaneType, Airplane, Crew, Route, Flight, Order, Ticket)
+            if model.objects.exists()
+        ]
+        if get_user_model().objects.filter(
+            username__startswith=f"synthetic-{options['seed']}-"
+        ).exists():
+            seeded.append(f"synthetic-{options['seed']}-* users")
+        if seeded:
+            raise CommandError(
+                f"The database already has {', '.join(seeded)}, run `manage.py flush` first"
+            )
+
+        start = options["start"]
+        if start is not None and timezone.is_naive(start):
+            start = timezone.make_aware(start)
+
+        dataset = SyntheticDataset(
+            seed=options["seed"],
+            airports=options["airports"],
+            hubs=options["hubs"],
+            airplanes=options["airplanes"],
+            flights=options["flights"],
+            users=options["users"],
+            load_factor=options["load_factor"],
+            start=start,
+            batch_size=options["batch_size"],
+            flights_per_chunk=options["flights_per_chunk"],
+        )
+        started = time.perf_counter()
+
+        def progress(counts):
+            self.stdout.write(
+                f"{counts['flights']}/{options['flights']} flights, "
+                f"{counts['tickets']} tickets, {time.perf_counter() - started:.1f}s"
+            )
+
+        try:
+            with use_primary():
+                counts = dataset.create(progress if options["verbosity"] > 1 else None)
+        except IntegrityError as error:
+            # rows written since the check above
+            raise CommandError(f"Seeding conflicts with existing data: {error}")
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            ", ".join(f"{count} {name}" for name, count in counts.items())
+            + f" in {seconds:.1f}s ({counts['tickets'] / seconds:.0f} tickets/sec)"
+        )
@@ -0,0 +1,273 @@
+"""
+Request metrics per resolved view, served in Prometheus text format.
+
+MetricsMiddleware counts requests, latency and the SQL queries of every
+view, e.g. "FlightViewSet.list". Queries are counted by an execute wrapper
+installed on every connection, including the ones sync_to_async threads of
+async views open, which adds them to the QueryTimer of the request in
+current_timer. The counters live in the worker process and are published to the default cache
+at most every METRICS_PUBLISH_SECONDS, so /metrics reports the sum over all
+gunicorn workers whichever of them answers the scrape.
+"""
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_WORKERS_KEY = "metrics:workers"
+
+
+def metrics_worker_key(worker_id):
+    return f"metrics:worker:{worker_id}"
+
+
+class QueryTimer:
+    """Execute wrapper counting the queries of one request and their time."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+current_timer = ContextVar("current_timer", default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    # first in the list, so execute_wrapper() blocks of others still pop their own
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+@receiver(connection_created)
+def install_on_new_connection(sender, connection, **kwargs):
+    install_query_timer(connection)
+
+
+@contextmanager
+def track_queries(timer):
+    """Count the queries run in this context, in any thread it is copied to, on timer"""
+    for connection in connections.all():
+        install_query_timer(connection)
+    token = current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        current_timer.reset(token)
+
+
+class MetricsRegistry:
+    """
+    Counters of one process: {view: [requests, latency sum, queries,
+    query seconds, *requests per latency bucket]}.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.views = {}
+        self.lock = threading.Lock()
+        self.published_at = 0.0
+
+    def record(self, view, seconds, timer):
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self.lock:
+            counters = self.views.get(view)
+            if counters is None:
+                counters = self.views[view] = [0, 0.0, 0, 0.0] + [0] * len(LATENCY_BUCKETS)
+            counters[0] += 1
+            counters[1] += seconds
+            counters[2] += timer.count
+            counters[3] += timer.seconds
+            if bucket < len(LATENCY_BUCKETS):
+                counters[4 + bucket] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {view: list(counters) for view, counters in self.views.items()}
+
+    def publish_due(self):
+        return time.monotonic() - self.published_at >= settings.METRICS_PUBLISH_SECONDS
+
+    def publish(self):
+        self.published_at = time.monotonic()
+        cache.set(
+            metrics_worker_key(self.worker_id), self.snapshot(), settings.METRICS_WORKER_TIMEOUT
+        )
+        workers = cache.get(METRICS_WORKERS_KEY, [])
+        if self.worker_id not in workers:
+            cache.set(METRICS_WORKERS_KEY, workers + [self.worker_id], None)
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+        self.published_at = 0.0
+
+
+registry = MetricsRegistry()
+
+
+def collect():
+    """Counters of every live worker, summed per view"""
+    registry.publish()
+    workers = cache.get(METRICS_WORKERS_KEY, [])
+    snapshots = cache.get_many([metrics_worker_key(worker_id) for worker_id in workers])
+
+    live = [worker_id for worker_id in workers if metrics_worker_key(worker_id) in snapshots]
+    if len(live) != len(workers):
+        cache.set(METRICS_WORKERS_KEY, live, None)
+
+    views = {}
+    for snapshot in snapshots.values():
+        for view, counters in snapshot.items():
+            total = views.setdefault(view, [0] * len(counters))
+            for index, value in enumerate(counters):
+                total[index] += value
+    return views
+
+
+def label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render(views):
+    lines = [
+        "# HELP airport_http_requests_total Requests handled, by view.",
+        "# TYPE airport_http_requests_total counter",
+    ]
+    lines += [
+        f'airport_http_requests_total{{view="{label(view)}"}} {counters[0]}'
+        for view, counters in sorted(views.items())
+    ]
+
+    lines += [
+        "# HELP airport_http_request_duration_seconds Request latency, by view.",
+        "# TYPE airport_http_request_duration_seconds histogram",
+    ]
+    for view, counters in sorted(views.items()):
+        view = label(view)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, counters[4:]):
+            cumulative += count
+            lines.append(
+                f'airport_http_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} '
+                f"{cumulative}"
+            )
+        lines += [
+            f'airport_http_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} '
+            f"{counters[0]}",
+            f'airport_http_request_duration_seconds_sum{{view="{view}"}} {counters[1]:.6f}',
+            f'airport_http_request_duration_seconds_count{{view="{view}"}} {counters[0]}',
+        ]
+
+    lines += [
+        "# HELP airport_db_queries_total SQL queries run, by view.",
+        "# TYPE airport_db_queries_total counter",
+    ]
+    lines += [
+        f'airport_db_queries_total{{view="{label(view)}"}} {counters[2]}'
+        for view, counters in sorted(views.items())
+    ]
+
+    lines += [
+        "# HELP airport_db_query_seconds_total Time spent in SQL queries, by view.",
+        "# TYPE airport_db_query_seconds_total counter",
+    ]
+    lines += [
+        f'airport_db_query_seconds_total{{view="{label(view)}"}} {counters[3]:.6f}'
+        for view, counters in sorted(views.items())
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def view_name(request):
+    """"FlightViewSet.list" for viewsets, "View.get" for class views, else the function name"""
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+
+    func = match.func
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if view_class is None:
+        return getattr(func, "__name__", "unknown")
+
+    method = request.method.lower()
+    actions = getattr(func, "actions", None)
+    if actions:
+        method = actions.get(method, method)
+    return f"{view_class.__name__}.{method}"
+
+
+class MetricsMiddleware:
+    """Records every request in the process registry. Place it first in MIDDLEWARE."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with track_queries(QueryTimer()) as timer:
+            response = self.get_response(request)
+
+        registry.record(view_name(request), time.perf_counter() - started, timer)
+        if registry.publish_due():
+            registry.publish()
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with track_queries(QueryTimer()) as timer:
+            response = await self.get_response(request)
+
+        registry.record(view_name(request), time.perf_counter() - started, timer)
+        if registry.publish_due():
+            await sync_to_async(registry.publish)()
+        return response
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint, guarded by METRICS_TOKEN when it is set.
+
+    Without a token only staff sessions may scrape, unless DEBUG is on.
+    """
+    if settings.METRICS_TOKEN:
+        if request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+            return HttpResponseForbidden()
+    elif not settings.DEBUG and not request.user.is_staff:
+        return HttpResponseForbidden()
+
+    return HttpResponse(render(collect()), content_type="text/plain; version=0.0.4")
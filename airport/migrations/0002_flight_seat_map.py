@@ -0,0 +1,36 @@
+# Generated by Django 5.0.8 on 2026-10-18 19:21
+
+from django.db import migrations, models
+
+from airport.seat_map import SeatMap
+
+
+def fill_seat_maps(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+
+    seats = {}
+    for flight_id, row, seat in Ticket.objects.values_list("flight_id", "row", "seat").iterator():
+        seats.setdefault(flight_id, []).append((row, seat))
+
+    for flight in Flight.objects.filter(id__in=seats).select_related("airplane"):
+        seat_map = SeatMap.from_seats(
+            flight.airplane.rows, flight.airplane.seats_in_row, seats[flight.id]
+        )
+        Flight.objects.filter(pk=flight.id).update(seat_map=seat_map.to_bytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flight',
+            name='seat_map',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.8 on 2026-10-18 19:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+from airport.seat_map import SeatMap
+
+
+def fill_search_index(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    FlightSearchIndex = apps.get_model("airport", "FlightSearchIndex")
+
+    rows = []
+    for flight in Flight.objects.select_related(
+        "route__source", "route__destination", "airplane"
+    ).iterator(chunk_size=2000):
+        airplane = flight.airplane
+        rows.append(
+            FlightSearchIndex(
+                flight_id=flight.id,
+                source_id=flight.route.source_id,
+                source_name=flight.route.source.name,
+                source_city=flight.route.source.closest_big_city,
+                destination_id=flight.route.destination_id,
+                destination_name=flight.route.destination.name,
+                destination_city=flight.route.destination.closest_big_city,
+                departure_time=flight.departure_time,
+                departure_date=timezone.localdate(flight.departure_time),
+                arrival_time=flight.arrival_time,
+                capacity=airplane.rows * airplane.seats_in_row,
+                sold=SeatMap(airplane.rows, airplane.seats_in_row, flight.seat_map).taken_count,
+            )
+        )
+        if len(rows) == 2000:
+            FlightSearchIndex.objects.bulk_create(rows)
+            rows = []
+    FlightSearchIndex.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0004_order_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightSearchIndex',
+            fields=[
+                ('flight', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='airport.flight')),
+                ('source_name', models.CharField(max_length=64)),
+                ('source_city', models.CharField(max_length=64)),
+                ('destination_name', models.CharField(max_length=64)),
+                ('destination_city', models.CharField(max_length=64)),
+                ('departure_time', models.DateTimeField()),
+                ('departure_date', models.DateField()),
+                ('arrival_time', models.DateTimeField()),
+                ('capacity', models.IntegerField()),
+                ('sold', models.IntegerField(default=0)),
+                ('destination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='airport.airport')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='airport.airport')),
+            ],
+            options={
+                'verbose_name_plural': 'Flight search index',
+                'indexes': [models.Index(fields=['source', 'destination', 'departure_time'], name='airport_fli_source__eb4654_idx'), models.Index(fields=['departure_date', 'source'], name='airport_fli_departu_e5f3a5_idx'), models.Index(fields=['departure_time'], name='airport_fli_departu_7b5019_idx')],
+            },
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+SEARCH_INDEXES = {
+    "airport_airport_name_trgm": "gin (UPPER(name) gin_trgm_ops)",
+    "airport_airport_city_trgm": "gin (UPPER(closest_big_city) gin_trgm_ops)",
+    "airport_airport_name_prefix": "btree (UPPER(name) text_pattern_ops)",
+    "airport_airport_city_prefix": "btree (UPPER(closest_big_city) text_pattern_ops)",
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    """Indexes for the icontains/istartswith lookups of airport suggestions, PostgreSQL only"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in SEARCH_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON airport_airport USING {definition}"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0005_flight_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
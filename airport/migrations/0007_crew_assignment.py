@@ -0,0 +1,75 @@
+# Generated by Django 5.0.8 on 2026-10-18 20:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_crew_assignments(apps, schema_editor):
+    """Copy Flight.crew, skipping assignments that overlap an earlier one of the same person"""
+    Flight = apps.get_model("airport", "Flight")
+    CrewAssignment = apps.get_model("airport", "CrewAssignment")
+
+    busy_until = {}
+    assignments = []
+    for crew_id, flight_id, starts_at, ends_at in Flight.crew.through.objects.order_by(
+        "flight__departure_time"
+    ).values_list(
+        "crew_id", "flight_id", "flight__departure_time", "flight__arrival_time"
+    ).iterator():
+        if crew_id in busy_until and busy_until[crew_id] > starts_at:
+            continue
+        busy_until[crew_id] = ends_at
+        assignments.append(
+            CrewAssignment(
+                crew_id=crew_id, flight_id=flight_id, starts_at=starts_at, ends_at=ends_at
+            )
+        )
+    CrewAssignment.objects.bulk_create(assignments, batch_size=2000)
+
+
+def add_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        "ALTER TABLE airport_crewassignment ADD CONSTRAINT crew_assignment_no_overlap "
+        "EXCLUDE USING gist (crew_id WITH =, tstzrange(starts_at, ends_at) WITH &&)"
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE airport_crewassignment DROP CONSTRAINT IF EXISTS crew_assignment_no_overlap"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0006_airport_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrewAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('crew', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='airport.crew')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='crew_assignments', to='airport.flight')),
+            ],
+            options={
+                'verbose_name_plural': 'Crew assignments',
+                'indexes': [models.Index(fields=['crew', 'starts_at', 'ends_at'], name='airport_cre_crew_id_605c8c_idx'), models.Index(fields=['starts_at', 'ends_at'], name='airport_cre_starts__21ea52_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='crewassignment',
+            constraint=models.UniqueConstraint(fields=('crew', 'flight'), name='unique_crew_assignment'),
+        ),
+        migrations.RunPython(fill_crew_assignments, migrations.RunPython.noop),
+        migrations.RunPython(add_overlap_constraint, drop_overlap_constraint),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.8 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport', '0007_crew_assignment'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='crew',
+            constraint=models.UniqueConstraint(fields=('first_name', 'last_name'), name='unique_crew_full_name'),
+        ),
+    ]
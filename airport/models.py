@@ -1,7 +1,10 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
+from django.utils import timezone
+
+from airport.seat_map import SeatMap
 
 
 class Airport(models.Model):
@@ -19,6 +22,7 @@ class Route(models.Model):
     source = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="departure_routes")
     destination = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="arrival_routes")
     distance = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Routes"
@@ -50,6 +54,7 @@ class Airplane(models.Model):
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
     airplane_type = models.ForeignKey(AirplaneType, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Airplanes"
@@ -76,17 +81,29 @@ class Crew(models.Model):
 
     class Meta:
         verbose_name_plural = "Crews"
+        constraints = [
+            UniqueConstraint(fields=["first_name", "last_name"], name="unique_crew_full_name")
+        ]
 
     def __str__(self):
         return self.first_name + " " + self.last_name
 
-    def clean(self):
-        if Crew.objects.filter(first_name=self.first_name, last_name=self.last_name).exists():
-            raise ValidationError("This person already exists")
-
-    def save(self, *args, **kwargs):
-        self.clean()
-        super().save(*args, **kwargs)
+    @classmethod
+    def upsert(cls, names, batch_size=None):
+        """
+        Create the missing crew among (first_name, last_name) pairs in one
+        statement per batch and return every listed member, ids included.
+        """
+        return cls.objects.bulk_create(
+            [
+                cls(first_name=first_name, last_name=last_name)
+                for first_name, last_name in dict.fromkeys(names)
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["first_name", "last_name"],
+            update_fields=["first_name"],
+        )
 
 
 class Order(models.Model):
@@ -95,6 +112,9 @@ class Order(models.Model):
 
     class Meta:
         verbose_name_plural = "Orders"
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
 
     def __str__(self):
         return f"{str(self.created_at)} - {self.user}"
@@ -106,6 +126,8 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew)
+    seat_map = models.BinaryField(default=b"", editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Flights"
@@ -140,6 +162,52 @@ class Flight(models.Model):
                 }
             )
 
+    def get_seat_map(self):
+        return SeatMap(self.airplane.rows, self.airplane.seats_in_row, self.seat_map)
+
+    @classmethod
+    def update_seat_map(cls, flight_id, take=(), release=()):
+        with transaction.atomic():
+            flight = (
+                cls.objects.select_for_update(of=("self",))
+                .select_related("airplane")
+                .only("seat_map", "airplane__rows", "airplane__seats_in_row")
+                .filter(pk=flight_id)
+                .first()
+            )
+            if flight is None:
+                return
+            seat_map = flight.get_seat_map()
+            for row, seat in release:
+                seat_map.release(row, seat)
+            for row, seat in take:
+                seat_map.take(row, seat)
+            cls.objects.filter(pk=flight_id).update(
+                seat_map=seat_map.to_bytes(), updated_at=timezone.now()
+            )
+            FlightSearchIndex.objects.filter(flight_id=flight_id).update(
+                sold=seat_map.taken_count
+            )
+
+    @classmethod
+    def rebuild_seat_maps(cls, flights):
+        flights = list(flights)
+        seats = {flight.id: [] for flight in flights}
+        for flight_id, row, seat in Ticket.objects.filter(
+            flight__in=flights
+        ).values_list("flight_id", "row", "seat"):
+            seats[flight_id].append((row, seat))
+        for flight in flights:
+            seat_map = SeatMap.from_seats(
+                flight.airplane.rows, flight.airplane.seats_in_row, seats[flight.id]
+            )
+            cls.objects.filter(pk=flight.id).update(
+                seat_map=seat_map.to_bytes(), updated_at=timezone.now()
+            )
+            FlightSearchIndex.objects.filter(flight_id=flight.id).update(
+                sold=seat_map.taken_count
+            )
+
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
@@ -196,3 +264,128 @@ class Ticket(models.Model):
         super(Ticket, self).save(
             force_insert, force_update, using, update_fields
         )
+
+
+class FlightSearchIndex(models.Model):
+    """
+    Denormalized search row of a flight: airports, dates, capacity and sold
+    seats without the route, airport and airplane joins.
+
+    Rows are rebuilt by refresh() from signals and bulk writers, and sold is
+    kept in step with the flight's seat map.
+    """
+    flight = models.OneToOneField(
+        Flight, on_delete=models.CASCADE, primary_key=True, related_name="search_index"
+    )
+    source = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="+")
+    destination = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="+")
+    source_name = models.CharField(max_length=64)
+    source_city = models.CharField(max_length=64)
+    destination_name = models.CharField(max_length=64)
+    destination_city = models.CharField(max_length=64)
+    departure_time = models.DateTimeField()
+    departure_date = models.DateField()
+    arrival_time = models.DateTimeField()
+    capacity = models.IntegerField()
+    sold = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Flight search index"
+        indexes = [
+            models.Index(fields=["source", "destination", "departure_time"]),
+            models.Index(fields=["departure_date", "source"]),
+            models.Index(fields=["departure_time"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source_name} - {self.destination_name} {self.departure_time}"
+
+    @classmethod
+    def refresh(cls, flights):
+        """Rebuild the rows of flights, given as ids or a Flight queryset"""
+        rows = Flight.objects.filter(pk__in=flights).values_list(
+            "id",
+            "route__source_id",
+            "route__source__name",
+            "route__source__closest_big_city",
+            "route__destination_id",
+            "route__destination__name",
+            "route__destination__closest_big_city",
+            "departure_time",
+            "arrival_time",
+            "airplane__rows",
+            "airplane__seats_in_row",
+            "seat_map",
+        )
+        cls.objects.bulk_create(
+            [
+                cls(
+                    flight_id=flight_id,
+                    source_id=source_id,
+                    source_name=source_name,
+                    source_city=source_city,
+                    destination_id=destination_id,
+                    destination_name=destination_name,
+                    destination_city=destination_city,
+                    departure_time=departure_time,
+                    departure_date=timezone.localdate(departure_time),
+                    arrival_time=arrival_time,
+                    capacity=rows * seats_in_row,
+                    sold=SeatMap(rows, seats_in_row, seat_map).taken_count,
+                )
+                for (
+                    flight_id,
+                    source_id,
+                    source_name,
+                    source_city,
+                    destination_id,
+                    destination_name,
+                    destination_city,
+                    departure_time,
+                    arrival_time,
+                    rows,
+                    seats_in_row,
+                    seat_map,
+                ) in rows
+            ],
+            update_conflicts=True,
+            unique_fields=["flight"],
+            update_fields=[
+                "source",
+                "source_name",
+                "source_city",
+                "destination",
+                "destination_name",
+                "destination_city",
+                "departure_time",
+                "departure_date",
+                "arrival_time",
+                "capacity",
+                "sold",
+            ],
+        )
+
+
+class CrewAssignment(models.Model):
+    """
+    Busy interval of a crew member on a flight, kept in step with Flight.crew
+    by airport.crew_schedule. On PostgreSQL an exclusion constraint keeps
+    the intervals of one crew member from overlapping (migration 0007).
+    """
+    crew = models.ForeignKey(Crew, on_delete=models.CASCADE, related_name="assignments")
+    flight = models.ForeignKey(Flight, on_delete=models.CASCADE, related_name="crew_assignments")
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Crew assignments"
+        constraints = [
+            UniqueConstraint(fields=["crew", "flight"], name="unique_crew_assignment")
+        ]
+        indexes = [
+            models.Index(fields=["crew", "starts_at", "ends_at"]),
+            models.Index(fields=["starts_at", "ends_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.crew} {self.starts_at} - {self.ends_at}"
@@ -0,0 +1,212 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.crew_schedule import CrewIntervalIndex, assign_crew, overlapping_assignments
+from airport.models import Airplane, Crew, Flight, FlightSearchIndex, Route
+
+CSV_CREW_SEPARATOR = ";"
+
+
+def read_csv(stream):
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        crew = row.get("crew") or ""
+        row["crew"] = [member for member in crew.split(CSV_CREW_SEPARATOR) if member.strip()]
+        yield line, row
+
+
+def read_jsonl(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else {"_invalid": text}
+
+
+def read_schedule(stream, file_format):
+    """Yield (line, row) pairs from a CSV or JSONL stream of text or bytes."""
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or hasattr(stream, "chunks"):
+        stream = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if file_format == "csv":
+        return read_csv(stream)
+    if file_format in ("jsonl", "json"):
+        return read_jsonl(stream)
+    raise ValueError(f"Unsupported schedule format: {file_format}")
+
+
+class ScheduleImporter:
+    """
+    Creates flights from schedule rows in chunks.
+
+    Airplanes (by name), routes and crew of a chunk are resolved with one
+    query each, as are the existing assignments of that crew, and flights,
+    their crew and search index rows are written with bulk_create.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+
+    def run(self, rows):
+        started = time.perf_counter()
+        report = {"rows": 0, "created": 0, "errors": []}
+        rows = iter(rows)
+
+        while chunk := list(islice(rows, self.chunk_size)):
+            report["rows"] += len(chunk)
+            report["created"] += self.import_chunk(chunk, report["errors"])
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        report["rows_per_second"] = (
+            round(report["rows"] / report["seconds"], 1) if report["seconds"] else report["rows"]
+        )
+        return report
+
+    def import_chunk(self, chunk, errors):
+        airplanes = Airplane.objects.in_bulk(
+            {str(row.get("airplane")) for _, row in chunk}, field_name="name"
+        )
+        route_ids = set(
+            Route.objects.filter(
+                id__in=self.to_ids(row.get("route") for _, row in chunk)
+            ).values_list("id", flat=True)
+        )
+        crew_ids = set(
+            Crew.objects.filter(
+                id__in=self.to_ids(
+                    member for _, row in chunk for member in self.crew_members(row) or []
+                )
+            ).values_list("id", flat=True)
+        )
+
+        built = []
+        for line, row in chunk:
+            try:
+                built.append((line, *self.build_flight(row, airplanes, route_ids, crew_ids)))
+            except ValidationError as error:
+                errors.append({"line": line, "errors": error.message_dict})
+
+        flights, flight_crews = [], []
+        schedule = self.crew_schedule(built)
+        for line, flight, crew in built:
+            busy = [
+                crew_id for crew_id in crew
+                if schedule.overlapping(crew_id, flight.departure_time, flight.arrival_time)
+            ]
+            if busy:
+                members = ", ".join(map(str, busy))
+                errors.append(
+                    {
+                        "line": line,
+                        "errors": {"crew": [f"crew {members} already assigned at that time"]},
+                    }
+                )
+                continue
+            for crew_id in crew:
+                schedule.add(crew_id, None, flight.departure_time, flight.arrival_time)
+            flights.append(flight)
+            flight_crews.append(crew)
+
+        with transaction.atomic():
+            Flight.objects.bulk_create(flights, batch_size=self.chunk_size)
+            Flight.crew.through.objects.bulk_create(
+                [
+                    Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+                    for flight, crew in zip(flights, flight_crews)
+                    for crew_id in crew
+                ],
+                batch_size=self.chunk_size,
+            )
+            FlightSearchIndex.refresh([flight.id for flight in flights])
+            assign_crew(
+                flights, {flight.id: crew for flight, crew in zip(flights, flight_crews)}
+            )
+
+        return len(flights)
+
+    @staticmethod
+    def crew_schedule(built):
+        """Existing assignments of the chunk's crew within its time span, in one query"""
+        crew_ids = {crew_id for _, _, crew in built for crew_id in crew}
+        if not crew_ids:
+            return CrewIntervalIndex()
+
+        return CrewIntervalIndex().load(
+            overlapping_assignments(
+                min(flight.departure_time for _, flight, _ in built),
+                max(flight.arrival_time for _, flight, _ in built),
+            ).filter(crew_id__in=crew_ids).order_by("crew_id", "starts_at").values_list(
+                "crew_id", "flight_id", "starts_at", "ends_at"
+            )
+        )
+
+    @staticmethod
+    def to_ids(values):
+        ids = set()
+        for value in values:
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    @staticmethod
+    def crew_members(row):
+        """The crew list of the row, [] when missing, None when it is not a list"""
+        crew = row.get("crew")
+        if crew is None:
+            return []
+        return crew if isinstance(crew, list) else None
+
+    def build_flight(self, row, airplanes, route_ids, crew_ids):
+        if "_invalid" in row:
+            raise ValidationError({"row": "invalid JSON object"})
+
+        errors = {}
+        airplane = airplanes.get(str(row.get("airplane")))
+        if airplane is None:
+            errors["airplane"] = f"airplane {row.get('airplane')!r} does not exist"
+
+        route_id = next(iter(self.to_ids([row.get("route")])), None)
+        if route_id not in route_ids:
+            errors["route"] = f"route {row.get('route')!r} does not exist"
+
+        members = self.crew_members(row)
+        crew = self.to_ids(members or [])
+        if members is None:
+            errors["crew"] = "must be a list of crew ids"
+        elif len(crew) != len(members) or not crew <= crew_ids:
+            errors["crew"] = "unknown crew member"
+
+        times = {}
+        for field in ("departure_time", "arrival_time"):
+            try:
+                parsed = parse_datetime(row.get(field))
+            except (TypeError, ValueError):
+                parsed = None
+            if parsed is None:
+                errors[field] = "invalid datetime"
+            elif timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            times[field] = parsed
+
+        if errors:
+            raise ValidationError(errors)
+
+        Flight.validate_departure_and_arrival_time(
+            times["departure_time"], times["arrival_time"], ValidationError
+        )
+        Flight.validate_departure_and_now_time(
+            times["departure_time"], timezone.now(), ValidationError
+        )
+
+        return Flight(route_id=route_id, airplane=airplane, **times), sorted(crew)
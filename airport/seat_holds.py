@@ -0,0 +1,40 @@
+from django.core.cache import cache
+
+
+def hold_key(flight_id, row, seat):
+    return f"seat-hold:{flight_id}:{row}:{seat}"
+
+
+def hold_seats(flight_id, seats, user_id, ttl):
+    """Hold seats for a user, all or nothing. Returns the seats held by somebody else."""
+    added, conflicts = [], []
+
+    for row, seat in seats:
+        key = hold_key(flight_id, row, seat)
+        if cache.add(key, user_id, ttl):
+            added.append(key)
+        elif cache.get(key) == user_id:
+            cache.touch(key, ttl)
+        else:
+            conflicts.append((row, seat))
+
+    if conflicts:
+        cache.delete_many(added)
+
+    return conflicts
+
+
+def seats_held_by_others(flight_seats, user_id):
+    keys = {hold_key(*flight_seat): flight_seat for flight_seat in flight_seats}
+    holders = cache.get_many(keys)
+
+    return {
+        keys[key] for key, holder in holders.items() if holder != user_id
+    }
+
+
+def release_seats(flight_seats, user_id):
+    keys = [hold_key(*flight_seat) for flight_seat in flight_seats]
+    holders = cache.get_many(keys)
+
+    cache.delete_many([key for key, holder in holders.items() if holder == user_id])
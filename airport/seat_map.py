@@ -0,0 +1,65 @@
+class SeatMap:
+    """Occupancy of a flight's rows x seats_in_row grid, stored as one bit per seat."""
+
+    def __init__(self, rows, seats_in_row, data=b""):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        size = (rows * seats_in_row + 7) // 8
+        self.data = bytearray(bytes(data or b"")[:size].ljust(size, b"\0"))
+
+    @classmethod
+    def from_seats(cls, rows, seats_in_row, seats):
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.take(row, seat)
+        return seat_map
+
+    def _position(self, row, seat):
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            return None
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 1 << (index & 7)
+
+    def is_taken(self, row, seat):
+        position = self._position(row, seat)
+        if position is None:
+            return False
+        byte, mask = position
+        return bool(self.data[byte] & mask)
+
+    def take(self, row, seat):
+        position = self._position(row, seat)
+        if position is not None:
+            byte, mask = position
+            self.data[byte] |= mask
+
+    def release(self, row, seat):
+        position = self._position(row, seat)
+        if position is not None:
+            byte, mask = position
+            self.data[byte] &= ~mask
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_in_row
+
+    @property
+    def taken_count(self):
+        return int.from_bytes(self.data, "little").bit_count()
+
+    @property
+    def available_count(self):
+        return self.capacity - self.taken_count
+
+    def to_bytes(self):
+        return bytes(self.data)
+
+    def as_rows(self):
+        bits = int.from_bytes(self.data, "little")
+        return [
+            [
+                bool(bits >> ((row * self.seats_in_row) + seat) & 1)
+                for seat in range(self.seats_in_row)
+            ]
+            for row in range(self.rows)
+        ]
@@ -1,7 +1,10 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework import serializers
 
+from airport.crew_schedule import find_conflicts
+from airport.seat_holds import release_seats, seats_held_by_others
 from airport.models import (
     Airport,
     Route,
@@ -63,6 +66,14 @@ class CrewSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "full_name")
 
 
+class CrewBulkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Crew
+        fields = ("first_name", "last_name")
+        # existing names are updated in place by Crew.upsert, not rejected
+        validators = []
+
+
 class FlightSerializer(serializers.ModelSerializer):
     crew = serializers.SlugRelatedField(
         many=True,
@@ -79,6 +90,60 @@ class FlightSerializer(serializers.ModelSerializer):
         model = Flight
         fields = ("id", "route_info", "airplane", "departure_time", "arrival_time", "crew")
 
+    def validate(self, attrs):
+        if self.instance is None:
+            return attrs
+
+        departure_time = attrs.get("departure_time", self.instance.departure_time)
+        arrival_time = attrs.get("arrival_time", self.instance.arrival_time)
+        Flight.validate_departure_and_arrival_time(
+            departure_time,
+            arrival_time,
+            serializers.ValidationError
+        )
+        self.validate_crew_available(
+            self.instance.crew.all(), departure_time, arrival_time, self.instance.id
+        )
+        return attrs
+
+    @staticmethod
+    def validate_crew_available(crew, departure_time, arrival_time, flight_id=None):
+        conflicts = find_conflicts(
+            [member.id for member in crew], departure_time, arrival_time, flight_id
+        )
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "crew": [
+                        f"{member.full_name} is already assigned to flight "
+                        f"{conflicts[member.id]} at that time"
+                        for member in crew
+                        if member.id in conflicts
+                    ]
+                }
+            )
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            # the exclusion constraint caught an assignment made since validate()
+            self.validate_crew_available(
+                instance.crew.all(),
+                validated_data.get("departure_time", instance.departure_time),
+                validated_data.get("arrival_time", instance.arrival_time),
+                instance.id,
+            )
+            raise
+
+
+class FlightListSerializer(FlightSerializer):
+    tickets_available = serializers.IntegerField(read_only=True)
+
+    class Meta(FlightSerializer.Meta):
+        fields = FlightSerializer.Meta.fields + ("tickets_available",)
+
 
 class CreateFlightSerializer(serializers.ModelSerializer):
     airplane = serializers.SlugRelatedField(
@@ -107,8 +172,24 @@ class CreateFlightSerializer(serializers.ModelSerializer):
             timezone.now(),
             serializers.ValidationError
         )
+        FlightSerializer.validate_crew_available(
+            attrs.get("crew", []), attrs["departure_time"], attrs["arrival_time"]
+        )
         return attrs
 
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # the exclusion constraint caught an assignment made since validate()
+            FlightSerializer.validate_crew_available(
+                validated_data.get("crew", []),
+                validated_data["departure_time"],
+                validated_data["arrival_time"],
+            )
+            raise
+
 
 class TicketSerializer(serializers.ModelSerializer):
     flight = serializers.CharField(
@@ -120,10 +201,40 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ("id", "row", "seat", "flight", "order")
 
 
+class PreloadedFlightField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "flights", {})
+        try:
+            return flights[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
+class TicketCreateListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            self.child.flights = Flight.objects.select_related("airplane").in_bulk(flight_ids)
+
+        return super().to_internal_value(data)
+
+
 class TicketCreateSerializer(serializers.ModelSerializer):
+    flight = PreloadedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     class Meta:
         model = Ticket
         fields = ("row", "seat", "flight")
+        list_serializer_class = TicketCreateListSerializer
+        # seat uniqueness is checked for all tickets at once in OrderSerializer
+        validators = []
 
     def validate(self, attrs):
         Ticket.validate_seat(
@@ -140,6 +251,27 @@ class TicketCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(many=True, allow_empty=False)
+    ttl = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.SEAT_HOLD_MAX_TTL,
+        default=settings.SEAT_HOLD_TTL,
+    )
+
+    def validate_seats(self, seats):
+        airplane = self.context["flight"].airplane
+        for seat in seats:
+            Ticket.validate_seat(seat["seat"], airplane.seats_in_row, serializers.ValidationError)
+            Ticket.validate_row(seat["row"], airplane.rows, serializers.ValidationError)
+        return seats
+
+
 class TicketListSerializer(serializers.ModelSerializer):
     flight = FlightSerializer(read_only=True)
 
@@ -160,10 +292,77 @@ class OrderSerializer(serializers.ModelSerializer):
             "created_at"
         ]
 
+    @staticmethod
+    def validate_seats_not_held(tickets, user_id):
+        held = seats_held_by_others(
+            [(ticket.flight_id, ticket.row, ticket.seat) for ticket in tickets], user_id
+        )
+
+        if held:
+            raise serializers.ValidationError(
+                {
+                    "tickets": [
+                        {
+                            "seat": f"seat {ticket.seat} in row {ticket.row} "
+                            "is held by another customer"
+                        }
+                        if (ticket.flight_id, ticket.row, ticket.seat) in held else {}
+                        for ticket in tickets
+                    ]
+                }
+            )
+
+    @staticmethod
+    def validate_seats_free(tickets):
+        taken = set(
+            Ticket.objects.filter(
+                flight_id__in={ticket.flight_id for ticket in tickets},
+                row__in={ticket.row for ticket in tickets},
+                seat__in={ticket.seat for ticket in tickets},
+            ).values_list("flight_id", "row", "seat")
+        )
+
+        errors = []
+        for ticket in tickets:
+            key = (ticket.flight_id, ticket.row, ticket.seat)
+            if key in taken:
+                errors.append({"seat": f"seat {ticket.seat} in row {ticket.row} is already taken"})
+            else:
+                errors.append({})
+            taken.add(key)
+
+        if any(errors):
+            raise serializers.ValidationError({"tickets": errors})
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            tickets = [Ticket(order=order, **ticket_data) for ticket_data in tickets_data]
+            flight_seats = [(ticket.flight_id, ticket.row, ticket.seat) for ticket in tickets]
+
+            # competing orders for the same flights wait here instead of failing on insert
+            list(
+                Flight.objects.select_for_update()
+                .filter(id__in={ticket.flight_id for ticket in tickets})
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            self.validate_seats_not_held(tickets, order.user_id)
+            self.validate_seats_free(tickets)
+
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(tickets)
+            except IntegrityError:
+                self.validate_seats_free(tickets)
+                raise
+
+            seats = {}
+            for ticket in tickets:
+                seats.setdefault(ticket.flight_id, []).append((ticket.row, ticket.seat))
+            for flight_id, taken_seats in seats.items():
+                Flight.update_seat_map(flight_id, take=taken_seats)
+
+            transaction.on_commit(lambda: release_seats(flight_seats, order.user_id))
             return order
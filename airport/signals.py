@@ -0,0 +1,181 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport.airport_search import bump_airport_search_version
+from airport.cache import invalidate_model
+from airport.crew_schedule import (
+    assign_crew,
+    bump_crew_schedule_version,
+    reschedule_crew,
+    unassign_crew,
+)
+from airport.itineraries import bump_route_index_version
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSearchIndex,
+    Route,
+    Ticket,
+)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, **kwargs):
+    instance._previous_seat = None
+    if instance.pk:
+        instance._previous_seat = Ticket.objects.filter(
+            pk=instance.pk
+        ).values_list("flight_id", "row", "seat").first()
+
+
+@receiver(post_save, sender=Ticket)
+def take_ticket_seat(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_seat", None)
+    if previous and previous[0] != instance.flight_id:
+        Flight.update_seat_map(previous[0], release=[previous[1:]])
+        previous = None
+    Flight.update_seat_map(
+        instance.flight_id,
+        take=[(instance.row, instance.seat)],
+        release=[previous[1:]] if previous else (),
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    Flight.update_seat_map(instance.flight_id, release=[(instance.row, instance.seat)])
+
+
+@receiver(post_save, sender=Airplane)
+def rebuild_airplane_seat_maps(sender, instance, created, **kwargs):
+    if not created:
+        Flight.rebuild_seat_maps(
+            Flight.objects.filter(airplane=instance).select_related("airplane").only(
+                "id", "airplane__rows", "airplane__seats_in_row"
+            )
+        )
+
+
+@receiver(post_save, sender=Flight)
+def rebuild_flight_seat_map(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or "airplane" in update_fields):
+        Flight.rebuild_seat_maps([instance])
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_search_index(sender, instance, **kwargs):
+    FlightSearchIndex.refresh([instance.id])
+
+
+@receiver(post_save, sender=Route)
+def refresh_route_search_index(sender, instance, created, **kwargs):
+    if not created:
+        FlightSearchIndex.refresh(Flight.objects.filter(route=instance))
+
+
+@receiver(post_save, sender=Airport)
+def refresh_airport_search_index(sender, instance, created, **kwargs):
+    if not created:
+        FlightSearchIndex.refresh(
+            Flight.objects.filter(Q(route__source=instance) | Q(route__destination=instance))
+        )
+
+
+@receiver(post_save, sender=Airplane)
+def refresh_airplane_search_index(sender, instance, created, **kwargs):
+    if not created:
+        FlightSearchIndex.refresh(Flight.objects.filter(airplane=instance))
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def refresh_route_index(sender, **kwargs):
+    bump_route_index_version()
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def refresh_airport_search(sender, **kwargs):
+    bump_airport_search_version()
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate_model(sender)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flights_on_crew_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        flights = Flight.objects.filter(pk=instance.pk)
+    elif pk_set:
+        flights = Flight.objects.filter(pk__in=pk_set)
+    else:
+        flights = Flight.objects.filter(crew=instance)
+    flights.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def sync_crew_assignments(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        if reverse:
+            flights = Flight.objects.filter(pk__in=pk_set).only("departure_time", "arrival_time")
+            assign_crew(flights, {flight.id: [instance.pk] for flight in flights})
+        else:
+            assign_crew([instance], {instance.pk: pk_set})
+    elif action == "post_remove":
+        if reverse:
+            unassign_crew(crew=instance, flight_id__in=pk_set)
+        else:
+            unassign_crew(flight=instance, crew_id__in=pk_set)
+    elif action == "post_clear":
+        unassign_crew(**{"crew" if reverse else "flight": instance})
+
+
+@receiver(post_save, sender=Flight)
+def reschedule_flight_crew(sender, instance, created, **kwargs):
+    if not created:
+        reschedule_crew(instance)
+
+
+@receiver(post_delete, sender=Flight)
+@receiver(post_delete, sender=Crew)
+def refresh_crew_schedule(sender, **kwargs):
+    bump_crew_schedule_version()
+
+
+@receiver(post_save, sender=Crew)
+@receiver(pre_delete, sender=Crew)
+def touch_crew_flights(sender, instance, **kwargs):
+    Flight.objects.filter(crew=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Airport)
+@receiver(pre_delete, sender=Airport)
+def touch_airport_routes(sender, instance, **kwargs):
+    Route.objects.filter(
+        Q(source=instance) | Q(destination=instance)
+    ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=AirplaneType)
+def touch_airplane_type_airplanes(sender, instance, **kwargs):
+    Airplane.objects.filter(airplane_type=instance).update(updated_at=timezone.now())
@@ -0,0 +1,383 @@
+"""
+Synthetic airport data for benchmarks and load tests.
+
+Everything is drawn from random streams seeded with seed, so the same seed,
+sizes and start give the same rows whatever the batch size. Rows are written with
+bulk_create, which sends no signals, so the data the API derives from them
+(seat maps, FlightSearchIndex rows, crew assignments and the cached indexes)
+is filled in here as well.
+"""
+import heapq
+import random
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from airport.airport_search import bump_airport_search_version
+from airport.cache import invalidate_model
+from airport.crew_schedule import assign_crew
+from airport.itineraries import bump_route_index_version
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    FlightSearchIndex,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.seat_map import SeatMap
+
+CITIES = (
+    "Kyiv", "Lviv", "Odesa", "Warsaw", "Krakow", "Berlin", "Munich", "Frankfurt",
+    "Vienna", "Prague", "Budapest", "Bucharest", "Sofia", "Athens", "Rome", "Milan",
+    "Madrid", "Barcelona", "Lisbon", "Paris", "Nice", "Amsterdam", "Brussels", "London",
+    "Dublin", "Copenhagen", "Oslo", "Stockholm", "Helsinki", "Riga", "Vilnius", "Tallinn",
+    "Zurich", "Geneva", "Istanbul", "Dubai", "Doha", "Tel Aviv", "Cairo", "New York",
+)
+AIRPLANE_TYPES = (
+    # name, rows, seats in row
+    ("Embraer E190", 25, 4),
+    ("Airbus A320", 30, 6),
+    ("Boeing 737-800", 32, 6),
+    ("Airbus A330", 40, 8),
+)
+FIRST_NAMES = (
+    "Olena", "Andrii", "Iryna", "Dmytro", "Kateryna", "Taras", "Sofiia", "Maksym",
+    "Anna", "Oleh", "Yulia", "Serhii", "Maria", "Bohdan", "Natalia", "Ivan",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Melnyk",
+    "Boiko", "Moroz", "Lysenko", "Marchenko", "Savchenko", "Rudenko",
+)
+CREW_PER_FLIGHT = 3
+CRUISE_SPEED_KMH = 800
+# trunk routes between hubs are flown this many times as often as a spoke
+HUB_ROUTE_WEIGHT = 4
+# tickets per order: mostly single travellers, some couples and families
+ORDER_SIZES = (1, 2, 3, 4)
+ORDER_SIZE_WEIGHTS = (55, 30, 10, 5)
+# concentration of the per-flight load factor around its mean
+LOAD_FACTOR_CONCENTRATION = 12
+
+
+class SyntheticDataset:
+    """
+    A hub-and-spoke network: hubs are linked with each other, every other
+    airport with one or two hubs. Each airplane has its own crew and flies
+    leg after leg from wherever it landed. Every flight sells a beta
+    distributed share of its seats, around load_factor, on distinct random
+    seats, grouped into orders of one to four tickets.
+
+    namespace prefixes the unique names (airports, airplane types, airplanes,
+    crew last names and usernames), so a dataset can be added next to others.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        airports=40,
+        hubs=None,
+        airplanes=20,
+        flights=2000,
+        users=1000,
+        load_factor=0.8,
+        start=None,
+        batch_size=5000,
+        flights_per_chunk=500,
+        namespace="",
+    ):
+        # separate streams, so changing the chunk size does not change the data
+        self.rng = random.Random(f"{seed}-network")
+        self.flight_rng = random.Random(f"{seed}-flights")
+        self.sales_rng = random.Random(f"{seed}-sales")
+        self.seed = seed
+        self.sizes = {
+            "airports": max(airports, 2),
+            "hubs": min(max(hubs or airports // 8, 1), max(airports, 2) - 1),
+            "airplanes": airplanes,
+            "flights": flights,
+            "users": max(users, 1),
+        }
+        self.load_factor = min(max(load_factor, 0.01), 0.99)
+        self.start = start or timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        self.batch_size = batch_size
+        self.flights_per_chunk = flights_per_chunk
+        self.namespace = namespace
+
+    def create(self, progress=None):
+        """
+        Write the dataset and return the number of rows of every model.
+        progress, if given, is called with the counts after every chunk of flights.
+        """
+        counts = dict.fromkeys(
+            ("airports", "routes", "airplanes", "crew", "users", "flights", "orders", "tickets"), 0
+        )
+        with transaction.atomic():
+            airports, hubs = self.create_airports()
+            routes = self.create_routes(airports, hubs)
+            airplanes, crew = self.create_airplanes(hubs)
+            users = self.create_users()
+            counts.update(
+                airports=len(airports),
+                routes=len(routes),
+                airplanes=len(airplanes),
+                crew=sum(len(team) for team in crew.values()),
+                users=len(users),
+            )
+
+            # orders are inserted with their ids, like loaddata does, so
+            # tickets can refer to them without reading them back
+            self.next_order_id = (Order.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            flights = self.plan_flights(routes, airplanes, hubs)
+            while chunk := list(islice(flights, self.flights_per_chunk)):
+                orders, tickets = self.create_chunk(chunk, crew, users)
+                counts["flights"] += len(chunk)
+                counts["orders"] += orders
+                counts["tickets"] += tickets
+                if progress is not None:
+                    progress(counts)
+
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Order]):
+                    cursor.execute(sql)
+
+        for model in (Airport, AirplaneType, Airplane, Route, Crew):
+            invalidate_model(model)
+        bump_route_index_version()
+        bump_airport_search_version()
+        return counts
+
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def insert_rows(self, model, fields, rows):
+        """
+        INSERT tuples of values with executemany and return their number.
+        Orders and tickets are the bulk of the data, so they skip model
+        instances and the per-value SQL compilation of bulk_create.
+        """
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(model._meta.get_field(field).column) for field in fields)
+        sql = (
+            f"INSERT INTO {quote_name(model._meta.db_table)} ({columns}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})"
+        )
+
+        count = 0
+        rows = iter(rows)
+        with connection.cursor() as cursor:
+            while batch := list(islice(rows, self.batch_size)):
+                cursor.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def create_airports(self):
+        airports = []
+        for index in range(self.sizes["airports"]):
+            city = CITIES[index % len(CITIES)]
+            number = index // len(CITIES)
+            airports.append(
+                Airport(
+                    name=f"{self.namespace}{city} International"
+                    + (f" {number + 1}" if number else ""),
+                    closest_big_city=city,
+                )
+            )
+        airports = self.bulk_create(Airport, airports)
+        return airports, self.rng.sample(airports, self.sizes["hubs"])
+
+    def create_routes(self, airports, hubs):
+        """Routes both ways between all hubs and between every spoke and its hubs"""
+        distances = {}
+        for source in hubs:
+            for destination in hubs:
+                if source.id < destination.id:
+                    distances[source, destination] = self.rng.randint(800, 6000)
+
+        hub_ids = {hub.id for hub in hubs}
+        for spoke in airports:
+            if spoke.id not in hub_ids:
+                for hub in self.rng.sample(hubs, min(len(hubs), self.rng.choice((1, 2)))):
+                    distances[spoke, hub] = self.rng.randint(200, 2000)
+
+        return self.bulk_create(
+            Route,
+            [
+                Route(source=source, destination=destination, distance=distance)
+                for (first, second), distance in distances.items()
+                for source, destination in ((first, second), (second, first))
+            ],
+        )
+
+    def create_airplanes(self, hubs):
+        airplane_types = self.bulk_create(
+            AirplaneType,
+            [AirplaneType(name=f"{self.namespace}{name}") for name, _, _ in AIRPLANE_TYPES],
+        )
+        airplanes = []
+        for index in range(self.sizes["airplanes"]):
+            type_index = self.rng.randrange(len(AIRPLANE_TYPES))
+            _, rows, seats_in_row = AIRPLANE_TYPES[type_index]
+            airplane = Airplane(
+                name=f"{self.namespace}UR-S{index:04d}",
+                rows=rows,
+                seats_in_row=seats_in_row,
+                airplane_type=airplane_types[type_index],
+            )
+            airplane.base = self.rng.choice(hubs)
+            airplanes.append(airplane)
+        airplanes = self.bulk_create(Airplane, airplanes)
+
+        members = self.bulk_create(
+            Crew,
+            [
+                Crew(
+                    first_name=FIRST_NAMES[index % len(FIRST_NAMES)],
+                    last_name=self.namespace
+                    + LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]
+                    + (f" {index}" if index >= len(FIRST_NAMES) * len(LAST_NAMES) else ""),
+                )
+                for index in range(len(airplanes) * CREW_PER_FLIGHT)
+            ],
+        )
+        crew = {
+            airplane.id: [
+                member.id
+                for member in members[index * CREW_PER_FLIGHT:(index + 1) * CREW_PER_FLIGHT]
+            ]
+            for index, airplane in enumerate(airplanes)
+        }
+        return airplanes, crew
+
+    def create_users(self):
+        password = make_password(None)
+        return self.bulk_create(
+            get_user_model(),
+            [
+                get_user_model()(
+                    username=f"{self.namespace}synthetic-{self.seed}-{index}", password=password
+                )
+                for index in range(self.sizes["users"])
+            ],
+        )
+
+    def plan_flights(self, routes, airplanes, hubs):
+        """
+        Yield unsaved flights in departure order. The airplane that is ready
+        first takes the next flight, on a route out of the airport it is at.
+        """
+        if not airplanes:
+            return
+        rng = self.flight_rng
+        hub_ids = {hub.id for hub in hubs}
+        departures = {}
+        for route in routes:
+            trunk = route.source_id in hub_ids and route.destination_id in hub_ids
+            airport_routes, weights = departures.setdefault(route.source_id, ([], []))
+            airport_routes.append(route)
+            weights.append(HUB_ROUTE_WEIGHT if trunk else 1)
+        departures = {
+            airport_id: (airport_routes, list(accumulate(weights)))
+            for airport_id, (airport_routes, weights) in departures.items()
+        }
+
+        ready = [
+            (
+                self.start + timedelta(minutes=rng.randrange(0, 24 * 60, 5)),
+                index,
+                airplane.base.id,
+            )
+            for index, airplane in enumerate(airplanes)
+        ]
+        heapq.heapify(ready)
+        for _ in range(self.sizes["flights"]):
+            departure_time, index, airport_id = heapq.heappop(ready)
+            airport_routes, cum_weights = departures[airport_id]
+            route = rng.choices(airport_routes, cum_weights=cum_weights)[0]
+            arrival_time = departure_time + timedelta(
+                minutes=30 + round(route.distance / CRUISE_SPEED_KMH * 60 / 5) * 5
+            )
+            heapq.heappush(
+                ready,
+                (
+                    arrival_time + timedelta(minutes=rng.randrange(45, 180, 5)),
+                    index,
+                    route.destination_id,
+                ),
+            )
+            yield Flight(
+                route=route,
+                airplane=airplanes[index],
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+
+    def sell_seats(self, flight):
+        """
+        (row, seat) of the sold seats, distinct so the tickets respect
+        unique_ticket_seat_row_flight.
+        """
+        seats_in_row = flight.airplane.seats_in_row
+        capacity = flight.airplane.rows * seats_in_row
+        load = self.sales_rng.betavariate(
+            self.load_factor * LOAD_FACTOR_CONCENTRATION,
+            (1 - self.load_factor) * LOAD_FACTOR_CONCENTRATION,
+        )
+        return [
+            (index // seats_in_row + 1, index % seats_in_row + 1)
+            for index in self.sales_rng.sample(range(capacity), round(capacity * load))
+        ]
+
+    def create_chunk(self, flights, crew, users):
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        orders, order_seats = [], []
+        for flight in flights:
+            seats = self.sell_seats(flight)
+            flight.seat_map = SeatMap.from_seats(
+                flight.airplane.rows, flight.airplane.seats_in_row, seats
+            ).to_bytes()
+
+            position = 0
+            while position < len(seats):
+                size = self.sales_rng.choices(ORDER_SIZES, ORDER_SIZE_WEIGHTS)[0]
+                user = users[self.sales_rng.randrange(len(users))]
+                orders.append((self.next_order_id, user.id, created_at))
+                order_seats.append((flight, seats[position:position + size]))
+                self.next_order_id += 1
+                position += size
+
+        self.bulk_create(Flight, flights)
+        self.insert_rows(Order, ("id", "user", "created_at"), orders)
+        tickets = self.insert_rows(
+            Ticket,
+            ("flight", "order", "row", "seat"),
+            (
+                (flight.id, order_id, row, seat)
+                for (order_id, _, _), (flight, seats) in zip(orders, order_seats)
+                for row, seat in seats
+            ),
+        )
+
+        crew_by_flight = {flight.id: crew[flight.airplane_id] for flight in flights}
+        self.bulk_create(
+            Flight.crew.through,
+            [
+                Flight.crew.through(flight_id=flight_id, crew_id=crew_id)
+                for flight_id, crew_ids in crew_by_flight.items()
+                for crew_id in crew_ids
+            ],
+        )
+        assign_crew(flights, crew_by_flight)
+        FlightSearchIndex.refresh([flight.id for flight in flights])
+        return len(orders), tickets
@@ -0,0 +1,126 @@
+import random
+import string
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.airport_search import AirportTrie, database_search, match_rank, words
+from airport.models import Airport, Route
+from airport.tests.order_flight_ticket_tests import FLIGHT_URL, sample_flight
+
+AIRPORT_SUGGEST_URL = reverse('airport:airports-suggest')
+
+
+class AirportTrieTests(SimpleTestCase):
+    def setUp(self):
+        self.trie = AirportTrie().build([
+            (1, "Boryspil International", "Kyiv", 3),
+            (2, "Kyiv Zhuliany", "Kyiv", 1),
+            (3, "Lviv Danylo Halytskyi", "Lviv", 2),
+            (4, "Kyivska Oblast Field", "Bila Tserkva", 0),
+        ])
+
+    def ids(self, query, limit=10):
+        return [airport["id"] for airport in self.trie.search(query, limit)]
+
+    def test_name_prefix_ranked_before_city_and_route_count(self):
+        self.assertEqual(self.ids("kyiv"), [2, 4, 1])
+
+    def test_matches_word_prefixes_of_every_query_word(self):
+        self.assertEqual(self.ids("dan lv"), [3])
+        self.assertEqual(self.ids("tserk"), [4])
+        self.assertEqual(self.ids("odesa"), [])
+
+    def test_limit(self):
+        self.assertEqual(self.ids("k", limit=2), [2, 4])
+
+    def test_no_matches_dropped_behind_popular_airports(self):
+        trie = AirportTrie().build(
+            [(index, f"Kyiv Field {index}", "Kyiv", 100) for index in range(200)]
+            + [(999, "Kyiv Zhuliany", "Kyiv", 0)]
+        )
+
+        self.assertEqual([airport["id"] for airport in trie.search("kyiv zhu", 10)], [999])
+        self.assertEqual(len(trie.search("ky", 500)), 201)
+
+    def test_matches_linear_scan_at_scale(self):
+        rng = random.Random(7)
+
+        def word():
+            return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+        airports = [
+            (index, f"{word()} {word()}", word(), rng.randint(0, 50)) for index in range(5000)
+        ]
+        trie = AirportTrie().build(airports)
+
+        for query in (word()[:rng.randint(1, 4)] for _ in range(50)):
+            expected = sorted(
+                (match_rank(query, name, city), -route_count, name, airport_id)
+                for airport_id, name, city, route_count in airports
+                if any(part.startswith(query) for part in words(f"{name} {city}"))
+            )[:10]
+            self.assertEqual(
+                [airport["id"] for airport in trie.search(query, 10)],
+                [row[-1] for row in expected],
+            )
+
+
+class AirportSuggestApiTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username='user', password='testpass')
+        )
+        self.kbp = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+        self.iev = Airport.objects.create(name="Zhuliany", closest_big_city="Kyiv")
+        self.lwo = Airport.objects.create(name="Lviv", closest_big_city="Lviv")
+        Route.objects.create(source=self.kbp, destination=self.lwo, distance=500)
+        Route.objects.create(source=self.lwo, destination=self.kbp, distance=500)
+
+    def test_suggest_ranked_by_route_count(self):
+        res = self.client.get(AIRPORT_SUGGEST_URL, {"q": "kyi"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(airport["id"], airport["route_count"]) for airport in res.data],
+            [(self.kbp.id, 2), (self.iev.id, 0)],
+        )
+
+    def test_suggest_sees_new_airports(self):
+        self.client.get(AIRPORT_SUGGEST_URL, {"q": "od"})
+        odesa = Airport.objects.create(name="Odesa", closest_big_city="Odesa")
+
+        res = self.client.get(AIRPORT_SUGGEST_URL, {"q": "od"})
+        self.assertEqual([airport["id"] for airport in res.data], [odesa.id])
+
+    def test_database_search_matches_word_prefixes(self):
+        Airport.objects.create(name="Kyiv Zhuliany International", closest_big_city="Kyiv")
+
+        self.assertEqual(
+            [airport["name"] for airport in database_search("kyiv", 10)],
+            ["Kyiv Zhuliany International", "Boryspil", "Zhuliany"],
+        )
+        self.assertEqual(
+            [airport["name"] for airport in database_search("INT zhu", 10)],
+            ["Kyiv Zhuliany International"],
+        )
+        self.assertEqual(database_search("uliany", 10), [])
+        self.assertEqual(database_search("k.", 10), [])
+
+    def test_suggest_requires_query(self):
+        res = self.client.get(AIRPORT_SUGGEST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_search_by_airport_name(self):
+        flight = sample_flight()
+        sample_flight()
+
+        res = self.client.get(FLIGHT_URL, {"search": flight.route.source.name})
+        self.assertEqual([item["id"] for item in res.data["results"]], [flight.id])
@@ -0,0 +1,99 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.order_flight_ticket_tests import (
+    detail_flight_url,
+    flight_seats_url,
+    sample_airplane,
+    sample_flight,
+)
+
+ASYNC_FLIGHT_URL = reverse('airport:async-flights')
+
+
+def async_detail_url(flight_id):
+    return reverse('airport:async-flight-detail', args=[flight_id])
+
+
+def async_seats_url(flight_id):
+    return reverse('airport:async-flight-seats', args=[flight_id])
+
+
+class AsyncFlightViewTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.async_client = AsyncClient()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.small_flight = sample_flight(airplane=sample_airplane(rows=2, seats_in_row=2))
+        Ticket.objects.create(
+            flight=self.small_flight, order=Order.objects.create(user=user), row=1, seat=2
+        )
+        self.tomorrow = timezone.now() + timezone.timedelta(days=1)
+        self.flight = sample_flight(
+            departure_time=self.tomorrow,
+            arrival_time=self.tomorrow + timezone.timedelta(hours=2),
+        )
+
+    async def drf_get(self, url):
+        res = await sync_to_async(self.client.get)(url)
+        return res.json()
+
+    async def test_detail_matches_flight_retrieve(self):
+        res = await self.async_client.get(async_detail_url(self.small_flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), await self.drf_get(detail_flight_url(self.small_flight.id)))
+        self.assertEqual(res.json()["tickets_available"], 3)
+
+    async def test_seats_match_flight_seats(self):
+        res = await self.async_client.get(async_seats_url(self.small_flight.id))
+
+        self.assertEqual(res.json(), await self.drf_get(flight_seats_url(self.small_flight.id)))
+
+    async def test_missing_flight(self):
+        res = await self.async_client.get(async_detail_url(self.flight.id + 100))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_search_by_route_and_date(self):
+        res = await self.async_client.get(
+            ASYNC_FLIGHT_URL,
+            {
+                "from": self.flight.route.source_id,
+                "to": self.flight.route.destination_id,
+                "date": timezone.localtime(self.tomorrow).date(),
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([flight["id"] for flight in res.json()], [self.flight.id])
+
+    async def test_search_min_available_and_limit(self):
+        res = await self.async_client.get(ASYNC_FLIGHT_URL, {"min_available": 4})
+        self.assertEqual([flight["id"] for flight in res.json()], [self.flight.id])
+
+        res = await self.async_client.get(ASYNC_FLIGHT_URL, {"limit": 1})
+        self.assertEqual([flight["id"] for flight in res.json()], [self.small_flight.id])
+
+    async def test_search_invalid_params(self):
+        res = await self.async_client.get(ASYNC_FLIGHT_URL, {"from": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json(), {"from": ["must be an integer"]})
+
+        res = await self.async_client.get(ASYNC_FLIGHT_URL, {"date": "2024-02-30"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", res.json())
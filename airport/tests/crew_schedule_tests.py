@@ -0,0 +1,159 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.crew_schedule import CrewIntervalIndex, bump_crew_schedule_version, find_conflicts
+from airport.models import CrewAssignment
+from airport.tests.order_flight_ticket_tests import (
+    FLIGHT_URL,
+    sample_airplane,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+CREW_AVAILABLE_URL = reverse('airport:crew-available')
+# one start so times built in a test and in its assertions match to the second
+START = timezone.now().replace(microsecond=0)
+
+
+def hours(count):
+    return START + timezone.timedelta(hours=count)
+
+
+class CrewIntervalIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = CrewIntervalIndex().load([
+            (1, 10, hours(1), hours(3)),
+            (1, 11, hours(5), hours(6)),
+            (2, 12, hours(2), hours(4)),
+        ])
+
+    def test_overlapping(self):
+        self.assertEqual(self.index.overlapping(1, hours(2), hours(5))[1], 10)
+        self.assertEqual(self.index.overlapping(1, hours(4), hours(7))[1], 11)
+        self.assertEqual(self.index.overlapping(2, hours(0), hours(3))[1], 12)
+
+    def test_adjacent_and_free_intervals_do_not_overlap(self):
+        self.assertIsNone(self.index.overlapping(1, hours(3), hours(5)))
+        self.assertIsNone(self.index.overlapping(1, hours(6), hours(8)))
+        self.assertIsNone(self.index.overlapping(3, hours(1), hours(8)))
+
+    def test_exclude_flight(self):
+        self.assertIsNone(self.index.overlapping(1, hours(1), hours(2), exclude_flight_id=10))
+
+    def test_added_intervals_without_flight(self):
+        self.index.add(2, None, hours(5), hours(6))
+
+        self.assertIsNotNone(self.index.overlapping(2, hours(5), hours(7), exclude_flight_id=12))
+
+
+class CrewScheduleApiTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        bump_crew_schedule_version()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(username='admin', password='testpass')
+        )
+        self.flight = sample_flight(departure_time=hours(2), arrival_time=hours(4))
+        self.busy = self.flight.crew.get()
+        self.free = sample_crew()
+
+    def test_assignments_follow_flight_crew_and_times(self):
+        self.flight.crew.add(self.free)
+        self.assertEqual(CrewAssignment.objects.filter(flight=self.flight).count(), 2)
+
+        self.flight.departure_time, self.flight.arrival_time = hours(6), hours(8)
+        self.flight.save()
+        self.assertFalse(
+            CrewAssignment.objects.filter(flight=self.flight)
+            .exclude(starts_at=hours(6), ends_at=hours(8))
+            .exists()
+        )
+
+        self.flight.crew.remove(self.busy)
+        self.assertEqual(
+            list(CrewAssignment.objects.values_list("crew_id", flat=True)), [self.free.id]
+        )
+
+    def test_find_conflicts(self):
+        self.assertEqual(
+            find_conflicts([self.busy.id, self.free.id], hours(3), hours(5)),
+            {self.busy.id: self.flight.id},
+        )
+        self.assertEqual(
+            find_conflicts([self.busy.id], hours(3), hours(5), exclude_flight_id=self.flight.id),
+            {},
+        )
+
+    def test_available_crew(self):
+        res = self.client.get(
+            CREW_AVAILABLE_URL, {"from": hours(3).isoformat(), "to": hours(5).isoformat()}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([crew["id"] for crew in res.data["results"]], [self.free.id])
+
+        res = self.client.get(
+            CREW_AVAILABLE_URL, {"from": hours(4).isoformat(), "to": hours(5).isoformat()}
+        )
+        self.assertEqual(
+            [crew["id"] for crew in res.data["results"]], [self.busy.id, self.free.id]
+        )
+
+    def test_available_crew_requires_interval(self):
+        res = self.client.get(CREW_AVAILABLE_URL, {"from": "tomorrow"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(
+            CREW_AVAILABLE_URL, {"from": "2024-02-30T10:00:00", "to": hours(5).isoformat()}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(
+            CREW_AVAILABLE_URL, {"from": hours(5).isoformat(), "to": hours(3).isoformat()}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_flight_with_busy_crew(self):
+        payload = {
+            "route": sample_route().id,
+            "airplane": sample_airplane().name,
+            "departure_time": hours(3),
+            "arrival_time": hours(5),
+            "crew": [self.busy.id, self.free.id],
+        }
+
+        res = self.client.post(FLIGHT_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crew", res.data)
+
+        payload["crew"] = [self.free.id]
+        res = self.client.post(FLIGHT_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
+        self.assertTrue(CrewAssignment.objects.filter(crew=self.free).exists())
+
+    def test_reschedule_flight_onto_busy_crew(self):
+        other = sample_flight(departure_time=hours(6), arrival_time=hours(8))
+        other.crew.set([self.busy])
+        url = reverse('airport:flights-detail', args=[other.id])
+
+        res = self.client.patch(url, {"departure_time": hours(3), "arrival_time": hours(5)})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crew", res.data)
+        self.assertEqual(CrewAssignment.objects.filter(crew=self.busy).count(), 2)
+
+        res = self.client.patch(url, {"departure_time": hours(7), "arrival_time": hours(9)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, msg=res.data)
+        self.assertTrue(
+            CrewAssignment.objects.filter(flight=other, starts_at=hours(7)).exists()
+        )
@@ -1,11 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 from airport.models import Crew
 
 CREW_URL = reverse('airport:crew-list')
+CREW_BULK_URL = reverse('airport:crew-bulk')
 
 
 def detail_crew_url(crew_id):
@@ -84,3 +87,59 @@ class CrewApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(crew1.id, [crew['id'] for crew in res.data['results']])
         self.assertNotIn(crew2.id, [crew['id'] for crew in res.data['results']])
+
+    def test_update_crew_keeping_name(self):
+        crew = sample_crew()
+
+        res = self.client.put(detail_crew_url(crew.id), {"first_name": "John", "last_name": "Doe"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_create_duplicate_crew(self):
+        sample_crew()
+
+        res = self.client.post(CREW_URL, {"first_name": "John", "last_name": "Doe"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Crew.objects.count(), 1)
+
+    def test_bulk_upsert_crew(self):
+        existing = sample_crew()
+        payload = [
+            {"first_name": "John", "last_name": "Doe"},
+            {"first_name": "Alice", "last_name": "Smith"},
+            {"first_name": "Alice", "last_name": "Smith"},
+        ]
+
+        res = self.client.post(CREW_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Crew.objects.count(), 2)
+        self.assertEqual(
+            {(crew["id"], crew["full_name"]) for crew in res.data},
+            {
+                (existing.id, "John Doe"),
+                (Crew.objects.get(first_name="Alice").id, "Alice Smith"),
+            },
+        )
+
+    def test_bulk_upsert_crew_rejects_invalid_rows(self):
+        res = self.client.post(
+            CREW_BULK_URL, [{"first_name": "John"}, {"first_name": "Alice", "last_name": "Smith"}],
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Crew.objects.exists())
+
+    def test_bulk_upsert_roster_in_constant_queries(self):
+        payload = [
+            {"first_name": f"First{index}", "last_name": f"Last{index}"} for index in range(500)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(CREW_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Crew.objects.count(), 500)
+        self.assertLess(len(queries), 10)
@@ -0,0 +1,184 @@
+import io
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.db import connections, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.db_router import (
+    DEFAULT_DB,
+    PrimaryPinningMiddleware,
+    PrimaryReplicaRouter,
+    pin_key,
+    pin_user,
+    use_primary,
+)
+from airport.models import Flight, FlightSearchIndex, Order
+from airport.tests.order_flight_ticket_tests import (
+    ORDER_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+REPLICA = "replica"
+
+
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    # TestCase would run every test inside a transaction, which reads from the primary
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter(replicas=["replica"])
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            username="router", password="router-password"
+        )
+
+    def route_read(self, request, user=None, status_code=200):
+        """db_for_read as seen from inside the view handling request"""
+        if user is not None:
+            request.user = user
+        aliases = []
+
+        def view(request):
+            aliases.append(self.router.db_for_read(Order))
+            return HttpResponse(status=status_code)
+
+        PrimaryPinningMiddleware(view)(request)
+        return aliases[0]
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+        self.assertEqual(self.router.db_for_write(Order), "default")
+
+    def test_one_replica_per_request(self):
+        router = PrimaryReplicaRouter(replicas=[f"replica_{index}" for index in range(8)])
+        aliases = []
+
+        def view(request):
+            aliases.extend(router.db_for_read(Order) for _ in range(20))
+            return HttpResponse()
+
+        PrimaryPinningMiddleware(view)(self.factory.get("/"))
+        self.assertEqual(len(set(aliases)), 1)
+
+        for _ in range(20):
+            PrimaryPinningMiddleware(view)(self.factory.get("/"))
+        self.assertGreater(len(set(aliases)), 1)
+
+    def test_without_replicas_reads_go_to_primary(self):
+        self.assertEqual(PrimaryReplicaRouter(replicas=[]).db_for_read(Order), "default")
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Order), "default")
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+
+    def test_transaction_reads_from_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Order), "default")
+            self.assertEqual(self.route_read(self.factory.get("/")), "default")
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+
+    def test_unsafe_request_reads_from_primary(self):
+        self.assertEqual(self.route_read(self.factory.post("/")), "default")
+        self.assertEqual(self.route_read(self.factory.get("/")), "replica")
+
+    def test_user_pinned_after_write(self):
+        self.route_read(self.factory.post("/"), self.user, status_code=201)
+
+        self.assertTrue(cache.get(pin_key(self.user.id)))
+        self.assertEqual(self.route_read(self.factory.get("/"), self.user), "default")
+        self.assertEqual(self.route_read(self.factory.get("/"), AnonymousUser()), "replica")
+
+    def test_failed_write_does_not_pin(self):
+        self.route_read(self.factory.post("/"), self.user, status_code=400)
+
+        self.assertIsNone(cache.get(pin_key(self.user.id)))
+
+    def test_pin_expires(self):
+        pin_user(self.user.id)
+        cache.delete(pin_key(self.user.id))
+
+        self.assertEqual(self.route_read(self.factory.get("/"), self.user), "replica")
+
+    def test_lazy_session_user_not_resolved(self):
+        pin_user(self.user.id)
+        user = SimpleLazyObject(lambda: self.fail("session user resolved"))
+
+        self.assertEqual(self.route_read(self.factory.get("/"), user), "replica")
+
+    def test_replicas_not_migrated(self):
+        self.assertTrue(self.router.allow_migrate("default", "airport"))
+        self.assertFalse(self.router.allow_migrate("replica", "airport"))
+
+
+class PrimaryPinningApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="router", password="router-password"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_order_creation_pins_user_to_primary(self):
+        flight = sample_flight()
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(cache.get(pin_key(self.user.id)))
+
+
+class ReplicaCommandTests(TransactionTestCase):
+    """Management commands with a second database alias mirroring the primary"""
+
+    def setUp(self):
+        connections.settings[REPLICA] = {
+            **connections[DEFAULT_DB].settings_dict, "TEST": {"MIRROR": DEFAULT_DB}
+        }
+        self.addCleanup(self.remove_replica)
+        router = override_settings(DATABASE_ROUTERS=[PrimaryReplicaRouter(replicas=[REPLICA])])
+        router.enable()
+        self.addCleanup(router.disable)
+
+    @staticmethod
+    def remove_replica():
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def test_import_schedule_writes_search_index(self):
+        route, airplane = sample_route(), sample_airplane()
+        departure = timezone.now() + timezone.timedelta(days=1)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as schedule:
+            for hours in range(3):
+                schedule.write(json.dumps({
+                    "route": route.id,
+                    "airplane": airplane.name,
+                    "departure_time": (departure + timezone.timedelta(hours=hours)).isoformat(),
+                    "arrival_time": (
+                        departure + timezone.timedelta(hours=hours, minutes=50)
+                    ).isoformat(),
+                }) + "\n")
+            schedule.flush()
+            call_command("import_schedule", schedule.name, stdout=io.StringIO())
+
+        self.assertEqual(Flight.objects.db_manager(REPLICA).count(), 3)
+        self.assertEqual(FlightSearchIndex.objects.db_manager(REPLICA).count(), 3)
@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import FlightSearchIndex, Order, Ticket
+from airport.schedule_import import ScheduleImporter
+from airport.tests.order_flight_ticket_tests import (
+    FLIGHT_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+
+class FlightSearchIndexTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane(rows=2, seats_in_row=2))
+
+    def index(self):
+        return FlightSearchIndex.objects.get(flight=self.flight)
+
+    def test_row_created_with_flight(self):
+        index = self.index()
+
+        self.assertEqual(index.source_id, self.flight.route.source_id)
+        self.assertEqual(index.destination_name, self.flight.route.destination.name)
+        self.assertEqual(index.departure_date, timezone.localdate(self.flight.departure_time))
+        self.assertEqual((index.capacity, index.sold), (4, 0))
+
+    def test_sold_follows_tickets(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=2, seat=2, flight=self.flight, order=order)
+        self.assertEqual(self.index().sold, 2)
+
+        ticket.delete()
+        self.assertEqual(self.index().sold, 1)
+
+    def test_related_changes_refresh_rows(self):
+        source = self.flight.route.source
+        source.name = "Renamed"
+        source.save()
+        airplane = self.flight.airplane
+        airplane.rows = 5
+        airplane.save()
+
+        index = self.index()
+        self.assertEqual((index.source_name, index.capacity), ("Renamed", 10))
+
+        self.flight.route = sample_route()
+        self.flight.save()
+        self.assertEqual(self.index().source_id, self.flight.route.source_id)
+
+    def test_schedule_import_fills_index(self):
+        departure = timezone.now() + timezone.timedelta(days=1)
+        report = ScheduleImporter().run([
+            (1, {
+                "route": self.flight.route_id,
+                "airplane": self.flight.airplane.name,
+                "departure_time": departure.isoformat(),
+                "arrival_time": (departure + timezone.timedelta(hours=2)).isoformat(),
+            }),
+        ])
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(FlightSearchIndex.objects.count(), 2)
+
+    def test_list_filters_by_airport_and_date(self):
+        other = sample_flight(
+            departure_time=timezone.now() + timezone.timedelta(days=2),
+            arrival_time=timezone.now() + timezone.timedelta(days=2, hours=2),
+        )
+        destination = other.route.destination
+        destination.closest_big_city = "Lviv"
+        destination.save()
+
+        res = self.client.get(FLIGHT_URL, {"source": self.flight.route.source.name.upper()})
+        self.assertEqual([flight["id"] for flight in res.data["results"]], [self.flight.id])
+
+        res = self.client.get(FLIGHT_URL, {"destination": "lviv"})
+        self.assertEqual([flight["id"] for flight in res.data["results"]], [other.id])
+
+        res = self.client.get(
+            FLIGHT_URL, {"date": timezone.localdate(other.departure_time).isoformat()}
+        )
+        self.assertEqual([flight["id"] for flight in res.data["results"]], [other.id])
+
+    def test_list_rejects_impossible_date(self):
+        res = self.client.get(FLIGHT_URL, {"date": "2024-02-30"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", res.data)
+
+    def test_list_invalid_date(self):
+        res = self.client.get(FLIGHT_URL, {"date": "soon"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Flight, Route
+from airport.tests.order_flight_ticket_tests import sample_airplane
+
+ITINERARY_URL = reverse('airport:itineraries-list')
+
+
+class ItineraryApiTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = sample_airplane()
+        self.date = (timezone.localtime() + timedelta(days=1)).date()
+        self.airports = {
+            code: Airport.objects.create(name=code, closest_big_city=code)
+            for code in ("KBP", "WAW", "FRA", "JFK")
+        }
+
+    def at(self, hour, minute=0, days=0):
+        return timezone.make_aware(
+            datetime.combine(self.date + timedelta(days=days), datetime.min.time())
+        ) + timedelta(hours=hour, minutes=minute)
+
+    def flight(self, source, destination, departure, arrival):
+        route, _ = Route.objects.get_or_create(
+            source=self.airports[source],
+            destination=self.airports[destination],
+            defaults={"distance": 1000},
+        )
+        return Flight.objects.create(
+            route=route, airplane=self.airplane, departure_time=departure, arrival_time=arrival
+        )
+
+    def search(self, source, destination, **params):
+        params.update({
+            "from": self.airports[source].id,
+            "to": self.airports[destination].id,
+            "date": self.date,
+        })
+        return self.client.get(ITINERARY_URL, params)
+
+    def test_direct_and_connecting_itineraries(self):
+        direct = self.flight("KBP", "JFK", self.at(9), self.at(20))
+        first_leg = self.flight("KBP", "FRA", self.at(6), self.at(8))
+        second_leg = self.flight("FRA", "JFK", self.at(10), self.at(18))
+
+        res = self.search("KBP", "JFK")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [[leg['id'] for leg in itinerary['legs']] for itinerary in res.data],
+            [[first_leg.id, second_leg.id], [direct.id]],
+        )
+
+    def test_connection_shorter_than_minimum_is_skipped(self):
+        self.flight("KBP", "FRA", self.at(6), self.at(8))
+        self.flight("FRA", "JFK", self.at(8, 15), self.at(16))
+
+        res = self.search("KBP", "JFK")
+
+        self.assertEqual(res.data, [])
+
+    def test_max_legs(self):
+        self.flight("KBP", "WAW", self.at(6), self.at(7))
+        self.flight("WAW", "FRA", self.at(8), self.at(10))
+        self.flight("FRA", "JFK", self.at(11), self.at(19))
+
+        self.assertEqual(self.search("KBP", "JFK").data, [])
+        self.assertEqual(len(self.search("KBP", "JFK", max_legs=3).data), 1)
+
+    def test_first_leg_departs_on_requested_date(self):
+        self.flight("KBP", "JFK", self.at(9, days=1), self.at(20, days=1))
+
+        self.assertEqual(self.search("KBP", "JFK").data, [])
+
+    def test_new_route_is_picked_up(self):
+        self.assertEqual(self.search("KBP", "WAW").data, [])
+
+        self.flight("KBP", "WAW", self.at(6), self.at(7))
+
+        self.assertEqual(len(self.search("KBP", "WAW").data), 1)
+
+    def test_query_count_does_not_depend_on_legs(self):
+        self.flight("KBP", "WAW", self.at(6), self.at(7))
+        self.flight("WAW", "FRA", self.at(8), self.at(10))
+        self.flight("FRA", "JFK", self.at(11), self.at(19))
+        self.search("KBP", "JFK", max_legs=3)
+
+        with self.assertNumQueries(3):
+            res = self.search("KBP", "JFK", max_legs=3)
+
+        self.assertEqual(len(res.data[0]['legs']), 3)
+
+    def test_invalid_params(self):
+        res = self.client.get(ITINERARY_URL, {"from": 1, "to": "x", "date": self.date})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(ITINERARY_URL, {"from": 1, "to": 2, "date": "tomorrow"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(ITINERARY_URL, {"from": 1, "to": 2, "date": "2024-02-30"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", res.data)
@@ -0,0 +1,115 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.metrics import QueryTimer, registry, track_queries
+from airport.tests.order_flight_ticket_tests import FLIGHT_URL, sample_flight
+
+METRICS_URL = reverse('metrics')
+
+
+def metric(text, name, view):
+    match = re.search(rf'^{name}{{view="{re.escape(view)}"}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def select_one():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    connection.close()
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        sample_flight()
+
+    def scrape(self):
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.content.decode()
+
+    def test_requests_and_queries_per_view_action(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(FLIGHT_URL)
+        self.client.get("/api/airport/missing/")
+
+        text = self.scrape()
+
+        self.assertEqual(metric(text, "airport_http_requests_total", "FlightViewSet.list"), 2)
+        self.assertEqual(metric(text, "airport_http_requests_total", "unresolved"), 1)
+        self.assertGreater(metric(text, "airport_db_queries_total", "FlightViewSet.list"), 0)
+        self.assertGreater(metric(text, "airport_db_query_seconds_total", "FlightViewSet.list"), 0)
+        self.assertIn(
+            'airport_http_request_duration_seconds_bucket{view="FlightViewSet.list",le="+Inf"} 2',
+            text,
+        )
+        self.assertEqual(
+            metric(text, "airport_http_request_duration_seconds_count", "FlightViewSet.list"), 2
+        )
+
+    async def test_async_view_queries_are_counted(self):
+        await AsyncClient().get(reverse('airport:async-flights'))
+
+        text = await self.async_scrape()
+
+        self.assertEqual(metric(text, "airport_http_requests_total", "flight_search"), 1)
+        self.assertGreater(metric(text, "airport_db_queries_total", "flight_search"), 0)
+
+    async def test_queries_in_other_threads_are_counted(self):
+        # async views run the ORM in sync_to_async threads with their own connections
+        with track_queries(QueryTimer()) as timer:
+            await sync_to_async(select_one, thread_sensitive=False)()
+
+        self.assertEqual(timer.count, 1)
+        self.assertGreater(timer.seconds, 0)
+
+    async def async_scrape(self):
+        res = await AsyncClient().get(METRICS_URL, headers={"Authorization": "Bearer secret"})
+        return res.content.decode()
+
+    def test_counters_summed_over_published_workers(self):
+        self.client.get(FLIGHT_URL)
+        registry.publish()
+        other_worker = registry.worker_id
+        registry.worker_id = "other"
+        try:
+            self.client.get(FLIGHT_URL)
+            text = self.scrape()
+        finally:
+            registry.worker_id = other_worker
+
+        # the second worker's registry still holds the first request too
+        self.assertEqual(metric(text, "airport_http_requests_total", "FlightViewSet.list"), 3)
+
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_staff_required_without_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(get_user_model().objects.create_user(
+            username="staff", password="staff-password", is_staff=True
+        ))
+
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_200_OK)
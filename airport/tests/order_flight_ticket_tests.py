@@ -1,11 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.urls import reverse
-from django.test import TestCase
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.utils import timezone
+from unittest import mock
+import json
 import uuid
 
+from airport.serializers import OrderSerializer
+from user.serializers import ClaimsTokenObtainPairSerializer
 from airport.models import (
     Order,
     Flight,
@@ -19,6 +26,8 @@ from airport.models import (
 
 ORDER_URL = reverse('airport:orders-list')
 TICKET_URL = reverse('airport:tickets-list')
+ORDER_EXPORT_URL = reverse('airport:orders-export')
+TICKET_EXPORT_URL = reverse('airport:tickets-export')
 FLIGHT_URL = reverse('airport:flights-list')
 
 
@@ -34,6 +43,10 @@ def detail_flight_url(flight_id):
     return reverse('airport:flights-detail', args=[flight_id])
 
 
+def flight_seats_url(flight_id):
+    return reverse('airport:flights-seats', args=[flight_id])
+
+
 def unique_name(base_name="Sample"):
     return f"{base_name} {uuid.uuid4()}"
 
@@ -88,6 +101,7 @@ def sample_flight(**params):
 
 class OrderApiTests(TestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             username='user',
@@ -119,6 +133,111 @@ class OrderApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
         self.assertTrue(Order.objects.filter(id=res.data['id']).exists())
 
+    def test_create_order_with_several_tickets(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": flight.id} for seat in range(1, 5)
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
+        self.assertEqual(Ticket.objects.filter(order_id=res.data['id']).count(), 4)
+        flight.refresh_from_db()
+        self.assertEqual(flight.get_seat_map().taken_count, 4)
+
+    def test_create_order_with_taken_seat(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        Ticket.objects.create(
+            row=1, seat=2, flight=flight, order=Order.objects.create(user=self.admin_user)
+        )
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": flight.id},
+                {"row": 1, "seat": 2, "flight": flight.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['tickets'][0], {})
+        self.assertIn('seat', res.data['tickets'][1])
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 0)
+
+    def test_create_order_with_duplicate_seats(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 2, "seat": 3, "flight": flight.id},
+                {"row": 2, "seat": 3, "flight": flight.id},
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('seat', res.data['tickets'][1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_order_seat_taken_during_insert(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        validate_seats_free = OrderSerializer.validate_seats_free
+        calls = []
+
+        def take_seat_concurrently(tickets):
+            if not calls:
+                calls.append(tickets)
+                Ticket.objects.create(
+                    row=1, seat=1, flight=flight, order=Order.objects.create(user=self.admin_user)
+                )
+                return
+            validate_seats_free(tickets)
+
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+        with mock.patch.object(
+            OrderSerializer, "validate_seats_free", side_effect=take_seat_concurrently
+        ):
+            res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('seat', res.data['tickets'][0])
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+
+        def order_queries(seats):
+            payload = {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id} for row, seat in seats
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(ORDER_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
+            return len(queries)
+
+        single_ticket = order_queries([(1, 1)])
+        many_tickets = order_queries([(2, seat) for seat in range(1, 7)] + [(3, 1), (3, 2)])
+
+        self.assertEqual(single_ticket, many_tickets)
+
+    def test_create_order_with_unknown_flight(self):
+        self.client.force_authenticate(self.user)
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": 999}]}
+
+        res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('flight', res.data['tickets'][0])
+
     def test_retrieve_orders_authenticated(self):
         self.client.force_authenticate(self.user)
         Order.objects.create(user=self.user)
@@ -128,6 +247,66 @@ class OrderApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data['results']), 2)
 
+    def test_retrieve_orders_cursor_pagination(self):
+        self.client.force_authenticate(self.user)
+        orders = [Order.objects.create(user=self.user) for _ in range(5)]
+
+        res = self.client.get(ORDER_URL, {'paginate': 'cursor', 'size': 3})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [order['id'] for order in res.data['results']],
+            [order.id for order in orders[:1:-1]]
+        )
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(
+            [order['id'] for order in res.data['results']],
+            [orders[1].id, orders[0].id]
+        )
+        self.assertIsNone(res.data['next'])
+
+    def test_export_orders(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=sample_flight(), order=order)
+        old_order = Order.objects.create(user=self.user)
+        Order.objects.filter(id=old_order.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=10)
+        )
+
+        res = self.client.get(ORDER_EXPORT_URL, {'date_from': timezone.localdate().isoformat()})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,created_at,user_id,user_email,tickets')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'{order.id},'))
+        self.assertTrue(lines[1].endswith(',user@test.com,1'))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_export_streamed_asynchronously_under_asgi(self):
+        token = ClaimsTokenObtainPairSerializer.get_token(self.admin_user).access_token
+        orders = [await Order.objects.acreate(user=self.user) for _ in range(3)]
+
+        res = await AsyncClient().get(
+            ORDER_EXPORT_URL,
+            {'file_format': 'jsonl'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        chunks = [chunk async for chunk in res.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(line) for line in b''.join(chunks).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [order.id for order in orders])
+
+    def test_export_orders_non_admin(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(ORDER_EXPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_retrieve_orders_unauthenticated(self):
         res = self.client.get(ORDER_URL)
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -135,6 +314,7 @@ class OrderApiTests(TestCase):
 
 class FlightApiTests(TestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             username='user',
@@ -197,9 +377,173 @@ class FlightApiTests(TestCase):
         res = self.client.post(FLIGHT_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_list_flights_tickets_available(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+
+        res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['tickets_available'], 58)
+
+    def test_retrieve_flights_cursor_pagination(self):
+        now = timezone.now()
+        flights = [
+            sample_flight(
+                departure_time=now + timezone.timedelta(hours=hours),
+                arrival_time=now + timezone.timedelta(hours=hours + 1),
+            )
+            for hours in (3, 1, 2)
+        ]
+
+        res = self.client.get(FLIGHT_URL, {'paginate': 'cursor', 'size': 2})
+        self.assertEqual(
+            [flight['id'] for flight in res.data['results']],
+            [flights[1].id, flights[2].id]
+        )
+        self.assertNotIn('count', res.data)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(res.data['next'])
+        self.assertEqual([flight['id'] for flight in res.data['results']], [flights[0].id])
+
+    def test_filter_and_order_flights_by_tickets_available(self):
+        self.client.force_authenticate(self.user)
+        big_flight = sample_flight()
+        small_flight = sample_flight(airplane=sample_airplane(rows=1, seats_in_row=2))
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=small_flight, order=order)
+
+        res = self.client.get(FLIGHT_URL, {'min_available': 2})
+        self.assertEqual([flight['id'] for flight in res.data['results']], [big_flight.id])
+
+        res = self.client.get(FLIGHT_URL, {'ordering': 'tickets_available'})
+        self.assertEqual(
+            [flight['id'] for flight in res.data['results']],
+            [small_flight.id, big_flight.id]
+        )
+
+    def test_filter_flights_by_invalid_min_available(self):
+        res = self.client.get(FLIGHT_URL, {'min_available': 'many'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_flights_query_count_does_not_grow(self):
+        order = Order.objects.create(user=self.user)
+        flight = sample_flight()
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+
+        with self.assertNumQueries(4):
+            self.client.get(FLIGHT_URL)
+
+        for _ in range(3):
+            Ticket.objects.create(row=2, seat=1, flight=sample_flight(), order=order)
+
+        with self.assertNumQueries(4):
+            self.client.get(FLIGHT_URL)
+
+    def test_fast_flight_list_matches_serializer(self):
+        flight = sample_flight()
+        flight.crew.add(sample_crew())
+        sample_flight(airplane=sample_airplane(rows=20, seats_in_row=6))
+        Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=Order.objects.create(user=self.user)
+        )
+
+        res = self.client.get(FLIGHT_URL)
+        fast_res = self.client.get(FLIGHT_URL, {'fast': 'true'})
+
+        self.assertEqual(fast_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast_res.json(), res.json())
+
+    def test_flights_not_modified(self):
+        flight = sample_flight()
+        res = self.client.get(FLIGHT_URL)
+        etag = res['ETag']
+        self.assertTrue(res.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(detail_flight_url(flight.id))
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_flight_etag_changes_with_tickets_and_crew(self):
+        flight = sample_flight()
+        etag = self.client.get(detail_flight_url(flight.id))['ETag']
+
+        Ticket.objects.create(
+            row=1, seat=1, flight=flight, order=Order.objects.create(user=self.user)
+        )
+        res = self.client.get(detail_flight_url(flight.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        crew_member = flight.crew.first()
+        crew_member.first_name = "Changed"
+        crew_member.save()
+        res = self.client.get(detail_flight_url(flight.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        etag = res['ETag']
+
+        flight.crew.add(sample_crew())
+        res = self.client.get(detail_flight_url(flight.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_flights_etag_changes_on_delete(self):
+        flight = sample_flight()
+        sample_flight()
+        etag = self.client.get(FLIGHT_URL)['ETag']
+
+        flight.delete()
+        res = self.client.get(FLIGHT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_flight_seats_show_taken_seats(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=flight, order=order)
+        Ticket.objects.create(row=10, seat=6, flight=flight, order=order)
+
+        res = self.client.get(flight_seats_url(flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['capacity'], 60)
+        self.assertEqual(res.data['available'], 58)
+        self.assertTrue(res.data['seats'][0][1])
+        self.assertTrue(res.data['seats'][9][5])
+        self.assertFalse(res.data['seats'][0][0])
+
+    def test_flight_seats_released_on_ticket_delete(self):
+        self.client.force_authenticate(self.user)
+        flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(row=3, seat=4, flight=flight, order=order)
+        ticket.delete()
+
+        res = self.client.get(flight_seats_url(flight.id))
+
+        self.assertEqual(res.data['available'], 60)
+        self.assertFalse(res.data['seats'][2][3])
+
+    def test_flight_seats_read_in_single_query(self):
+        flight = sample_flight()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(flight_seats_url(flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
 
 class TicketApiTests(TestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.client = APIClient()
         self.admin_user = get_user_model().objects.create_superuser(
             username='admin',
@@ -222,6 +566,104 @@ class TicketApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data['results']), 2)
 
+    def test_fast_ticket_list_matches_serializer(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        Ticket.objects.create(row=1, seat=1, flight=sample_flight(), order=order)
+        Ticket.objects.create(row=2, seat=2, flight=sample_flight(), order=order)
+
+        res = self.client.get(TICKET_URL)
+        fast_res = self.client.get(TICKET_URL, {'fast': 'true'})
+
+        self.assertEqual(fast_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast_res.json(), res.json())
+
+    def test_export_tickets_jsonl(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        flight = sample_flight()
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=2, seat=3, flight=flight, order=order)
+
+        res = self.client.get(TICKET_EXPORT_URL, {'file_format': 'jsonl'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(res.streaming_content).splitlines()]
+        self.assertEqual([(row['row'], row['seat']) for row in rows], [(1, 1), (2, 3)])
+        self.assertEqual(rows[0]['source'], flight.route.source.name)
+
+    def test_export_tickets_invalid_params(self):
+        self.client.force_authenticate(self.admin_user)
+
+        res = self.client.get(TICKET_EXPORT_URL, {'file_format': 'xml'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(TICKET_EXPORT_URL, {'date_to': 'yesterday'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(TICKET_EXPORT_URL, {'date_from': '2024-02-30'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date_from', res.data)
+
+    def test_list_tickets_query_count_does_not_grow(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        Ticket.objects.create(row=1, seat=1, flight=sample_flight(), order=order)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TICKET_URL)
+
+        for _ in range(4):
+            Ticket.objects.create(row=1, seat=1, flight=sample_flight(), order=order)
+
+        with self.assertNumQueries(len(queries)):
+            res = self.client.get(TICKET_URL)
+        self.assertEqual(res.data['count'], 5)
+
+    def test_search_tickets_by_route_label(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        flight = sample_flight()
+        ticket = Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=1, seat=1, flight=sample_flight(), order=order)
+
+        res = self.client.get(TICKET_URL, {'search': flight.route.get_info})
+        self.assertEqual([item['id'] for item in res.data['results']], [ticket.id])
+
+        res = self.client.get(TICKET_URL, {'search': flight.route.destination.name})
+        self.assertEqual([item['id'] for item in res.data['results']], [ticket.id])
+
+    def test_search_tickets_by_route_label_skips_reverse_route(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        route = sample_route()
+        reverse_route = sample_route(source=route.destination, destination=route.source)
+        ticket = Ticket.objects.create(row=1, seat=1, flight=sample_flight(route=route), order=order)
+        Ticket.objects.create(
+            row=1, seat=1, flight=sample_flight(route=reverse_route), order=order
+        )
+
+        res = self.client.get(TICKET_URL, {'search': route.get_info})
+        self.assertEqual([item['id'] for item in res.data['results']], [ticket.id])
+
+    def test_order_tickets_by_source_name(self):
+        self.client.force_authenticate(self.admin_user)
+        order = Order.objects.create(user=self.admin_user)
+        tickets = [
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                flight=sample_flight(route=sample_route(source=sample_airport(name=name))),
+                order=order,
+            )
+            for name in ("Odesa", "Boryspil")
+        ]
+
+        res = self.client.get(TICKET_URL, {'ordering': 'flight__route__source__name'})
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [tickets[1].id, tickets[0].id]
+        )
+
     def test_create_ticket_non_admin(self):
         self.client.force_authenticate(self.user)
         order = Order.objects.create(user=self.user)
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.cache import response_cache
+from airport.models import Airport, Route
+
+AIRPORT_URL = reverse('airport:airports-list')
+ROUTE_URL = reverse('airport:routes-list')
+CACHE_STATS_URL = reverse('airport:cache-stats')
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.admin_user)
+        self.source = Airport.objects.create(name='Boryspil', closest_big_city='Kyiv')
+        self.destination = Airport.objects.create(name='Chopin', closest_big_city='Warsaw')
+
+    def test_repeated_list_served_from_cache(self):
+        first = self.client.get(AIRPORT_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json(), first.json())
+
+    def test_query_params_are_part_of_key(self):
+        self.client.get(AIRPORT_URL)
+
+        res = self.client.get(AIRPORT_URL, {'name': 'Chopin'})
+
+        self.assertEqual([airport['name'] for airport in res.json()['results']], ['Chopin'])
+
+    def test_save_invalidates_cache(self):
+        self.client.get(AIRPORT_URL)
+
+        Airport.objects.create(name='Heathrow', closest_big_city='London')
+        res = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(res.json()['count'], 3)
+
+    def test_related_model_change_invalidates_cache(self):
+        route = Route.objects.create(
+            source=self.source, destination=self.destination, distance=700
+        )
+        self.client.get(ROUTE_URL)
+
+        self.source.name = 'Kyiv Boryspil'
+        self.source.save()
+        res = self.client.get(ROUTE_URL)
+
+        self.assertEqual(res.json()['results'][0]['get_info'], str(Route.objects.get(id=route.id)))
+
+    def test_cache_stats(self):
+        self.client.get(AIRPORT_URL)
+        self.client.get(AIRPORT_URL)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.data['AirportViewSet'], {'hits': 1, 'misses': 1})
+
+    def test_cache_stats_non_admin(self):
+        user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
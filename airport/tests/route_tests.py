@@ -120,3 +120,22 @@ class RouteApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(route1.id, [route['id'] for route in res.data['results']])
         self.assertNotIn(route2.id, [route['id'] for route in res.data['results']])
+
+    def test_route_not_modified(self):
+        route = sample_route()
+        res = self.client.get(detail_url(route.id))
+
+        res = self.client.get(detail_url(route.id), HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_route_modified_after_airport_rename(self):
+        route = sample_route()
+        etag = self.client.get(detail_url(route.id))['ETag']
+
+        route.source.name = unique_name('Renamed Airport')
+        route.source.save()
+        res = self.client.get(detail_url(route.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(route.source.name, res.data['get_info'])
@@ -0,0 +1,144 @@
+import io
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight
+from airport.tests.order_flight_ticket_tests import sample_airplane, sample_crew, sample_route
+
+FLIGHT_BULK_URL = reverse('airport:flights-bulk')
+
+
+class ScheduleImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.admin_user)
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.crew = [sample_crew(), sample_crew()]
+
+    def schedule_row(self, hours=1, minutes=0, **params):
+        departure_time = timezone.now() + timezone.timedelta(hours=hours, minutes=minutes)
+        row = {
+            "route": self.route.id,
+            "airplane": self.airplane.name,
+            "departure_time": departure_time.isoformat(),
+            "arrival_time": (departure_time + timezone.timedelta(minutes=50)).isoformat(),
+            "crew": [member.id for member in self.crew],
+        }
+        row.update(params)
+        return row
+
+    def test_bulk_import_json(self):
+        payload = [self.schedule_row(hours) for hours in range(1, 6)]
+
+        res = self.client.post(FLIGHT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, msg=res.data)
+        self.assertEqual(res.data['created'], 5)
+        self.assertEqual(res.data['errors'], [])
+        self.assertEqual(Flight.objects.count(), 5)
+        self.assertEqual(Flight.crew.through.objects.count(), 10)
+
+    def test_bulk_import_reports_row_errors(self):
+        payload = [
+            self.schedule_row(),
+            self.schedule_row(airplane="Unknown"),
+            self.schedule_row(arrival_time=timezone.now().isoformat(), hours=5),
+            self.schedule_row(crew=[999]),
+            "not an object",
+            self.schedule_row(hours=7, crew=5),
+        ]
+
+        res = self.client.post(FLIGHT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(
+            {error['line']: set(error['errors']) for error in res.data['errors']},
+            {2: {'airplane'}, 3: {'departure_time'}, 4: {'crew'}, 5: {'row'}, 6: {'crew'}},
+        )
+        self.assertEqual(res.data['errors'][-1]['errors']['crew'], ['must be a list of crew ids'])
+
+    def test_bulk_import_rejects_busy_crew(self):
+        Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=timezone.now() + timezone.timedelta(hours=1, minutes=30),
+            arrival_time=timezone.now() + timezone.timedelta(hours=2, minutes=30),
+        ).crew.add(self.crew[0])
+        payload = [
+            self.schedule_row(hours=1, crew=[self.crew[1].id]),
+            self.schedule_row(hours=1, minutes=10, crew=[self.crew[1].id]),
+            self.schedule_row(hours=2),
+            self.schedule_row(hours=3),
+        ]
+
+        res = self.client.post(FLIGHT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(
+            {error['line']: set(error['errors']) for error in res.data['errors']},
+            {2: {'crew'}, 3: {'crew'}},
+        )
+
+    def test_bulk_import_csv_upload(self):
+        row = self.schedule_row()
+        content = (
+            "route,airplane,departure_time,arrival_time,crew\n"
+            f"{row['route']},{row['airplane']},{row['departure_time']},{row['arrival_time']},"
+            f"{self.crew[0].id};{self.crew[1].id}\n"
+        )
+        upload = SimpleUploadedFile("schedule.csv", content.encode(), content_type="text/csv")
+
+        res = self.client.post(FLIGHT_BULK_URL, {"file": upload}, format='multipart')
+
+        self.assertEqual(res.data['created'], 1, msg=res.data)
+        self.assertEqual(Flight.objects.get().crew.count(), 2)
+
+    def test_bulk_import_query_count_does_not_grow_with_rows(self):
+        def import_queries(rows):
+            payload = [self.schedule_row(hours) for hours in range(1, rows + 1)]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(FLIGHT_BULK_URL, payload, format='json')
+            return len(queries)
+
+        self.assertEqual(import_queries(1), import_queries(50))
+
+    def test_bulk_import_non_admin(self):
+        user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.post(FLIGHT_BULK_URL, [self.schedule_row()], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_schedule_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as schedule:
+            for hours in range(1, 4):
+                schedule.write(json.dumps(self.schedule_row(hours)) + "\n")
+            schedule.flush()
+
+            out = io.StringIO()
+            call_command("import_schedule", schedule.name, chunk_size=2, stdout=out)
+
+        self.assertEqual(Flight.objects.count(), 3)
+        self.assertIn("3 flights created", out.getvalue())
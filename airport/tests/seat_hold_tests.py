@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.seat_holds import hold_seats
+from airport.tests.order_flight_ticket_tests import ORDER_URL, sample_flight
+
+
+def flight_holds_url(flight_id):
+    return reverse('airport:flights-holds', args=[flight_id])
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            username='other',
+            email='other@test.com',
+            password='testpass'
+        )
+        self.flight = sample_flight()
+
+    def hold(self, user, seats, **params):
+        self.client.force_authenticate(user)
+        payload = {"seats": [{"row": row, "seat": seat} for row, seat in seats]}
+        payload.update(params)
+        return self.client.post(flight_holds_url(self.flight.id), payload, format='json')
+
+    def order(self, user, seats):
+        self.client.force_authenticate(user)
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "flight": self.flight.id} for row, seat in seats
+            ]
+        }
+        return self.client.post(ORDER_URL, payload, format='json')
+
+    def test_hold_seats(self):
+        res = self.hold(self.user, [(1, 1), (1, 2)], ttl=60)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
+        self.assertEqual(len(res.data['seats']), 2)
+
+    def test_hold_seats_unauthenticated(self):
+        res = self.client.post(
+            flight_holds_url(self.flight.id), {"seats": [{"row": 1, "seat": 1}]}, format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hold_seat_out_of_range(self):
+        res = self.hold(self.user, [(11, 1)])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hold_seat_held_by_other_user(self):
+        self.hold(self.user, [(1, 1)])
+
+        res = self.hold(self.other_user, [(1, 2), (1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['seats'], [{"row": 1, "seat": 1}])
+        self.assertEqual(self.hold(self.user, [(1, 2)]).status_code, status.HTTP_201_CREATED)
+
+    def test_hold_taken_seat(self):
+        order = Order.objects.create(user=self.other_user)
+        Ticket.objects.create(row=2, seat=2, flight=self.flight, order=order)
+
+        res = self.hold(self.user, [(2, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_order_held_seat_by_other_user(self):
+        self.hold(self.user, [(3, 3)])
+
+        res = self.order(self.other_user, [(3, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('seat', res.data['tickets'][0])
+
+    def test_order_converts_own_hold(self):
+        self.hold(self.user, [(3, 3)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.order(self.user, [(3, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, msg=res.data)
+        self.assertEqual(
+            self.hold(self.other_user, [(3, 4)]).status_code, status.HTTP_201_CREATED
+        )
+        self.assertEqual(
+            self.hold(self.other_user, [(3, 3)]).status_code, status.HTTP_409_CONFLICT
+        )
+
+
+class SeatHoldConcurrencyTests(SimpleTestCase):
+    threads = 32
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_holds_never_double_book(self):
+        seats = [(row, seat) for row in range(1, 4) for seat in range(1, 7)]
+        winners = {}
+        latencies = []
+        lock = threading.Lock()
+        start = threading.Barrier(self.threads)
+
+        def buyer(user_id):
+            start.wait()
+            for row, seat in seats:
+                started = time.perf_counter()
+                conflicts = hold_seats(1, [(row, seat)], user_id, 60)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if not conflicts:
+                        winners.setdefault((row, seat), []).append(user_id)
+
+        workers = [
+            threading.Thread(target=buyer, args=(user_id,)) for user_id in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(set(winners), set(seats))
+        self.assertTrue(all(len(users) == 1 for users in winners.values()), winners)
+        self.assertLess(max(latencies), 0.5)
+
+    def test_group_hold_is_all_or_nothing(self):
+        hold_seats(1, [(1, 2)], "first", 60)
+
+        conflicts = hold_seats(1, [(1, 1), (1, 2), (1, 3)], "second", 60)
+
+        self.assertEqual(conflicts, [(1, 2)])
+        self.assertEqual(hold_seats(1, [(1, 1), (1, 3)], "third", 60), [])
+
+
+class ConcurrentOrderTests(TransactionTestCase):
+    threads = 8
+
+    def setUp(self):
+        caches['throttle'].clear()
+        cache.clear()
+        self.flight = sample_flight()
+        self.users = [
+            get_user_model().objects.create_user(username=f"buyer-{index}")
+            for index in range(self.threads)
+        ]
+
+    def test_concurrent_orders_for_one_seat_have_one_winner(self):
+        statuses = []
+        lock = threading.Lock()
+        start = threading.Barrier(self.threads)
+
+        def buyer(user):
+            client = APIClient(raise_request_exception=False)
+            client.force_authenticate(user)
+            payload = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+            try:
+                start.wait()
+                res = client.post(ORDER_URL, payload, format='json')
+                with lock:
+                    statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=buyer, args=(user,)) for user in self.users]
+        # SQLite has no row locks, the losers fail on the locked table with a 500
+        with mock.patch.object(logging.getLogger("django.request"), "disabled", True):
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 1, statuses)
+        if connection.features.has_select_for_update:
+            self.assertEqual(
+                statuses.count(status.HTTP_400_BAD_REQUEST), self.threads - 1, statuses
+            )
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.get_seat_map().taken_count, 1)
@@ -0,0 +1,147 @@
+import io
+import json
+import os
+import tempfile
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from airport.models import Crew, CrewAssignment, Flight, FlightSearchIndex, Order, Route, Ticket
+from airport.synthetic import CREW_PER_FLIGHT, SyntheticDataset
+
+START = timezone.now().replace(microsecond=0) + timezone.timedelta(days=1)
+SIZES = {"airports": 8, "hubs": 2, "airplanes": 3, "flights": 30, "users": 5}
+
+
+def ticket_rows():
+    return sorted(
+        Ticket.objects.values_list(
+            "flight__route__source__name", "flight__departure_time", "row", "seat"
+        )
+    )
+
+
+class SyntheticDatasetTests(TestCase):
+    def test_counts_and_derived_data_match(self):
+        rows = SyntheticDataset(seed=1, start=START, flights_per_chunk=7, **SIZES).create()
+
+        self.assertEqual(rows["flights"], 30)
+        self.assertEqual(Flight.objects.count(), 30)
+        self.assertEqual(Ticket.objects.count(), rows["tickets"])
+        self.assertEqual(Order.objects.count(), rows["orders"])
+        self.assertEqual(FlightSearchIndex.objects.count(), 30)
+        self.assertEqual(CrewAssignment.objects.count(), 30 * CREW_PER_FLIGHT)
+
+        sold = Counter(Ticket.objects.values_list("flight_id", flat=True))
+        for flight in Flight.objects.select_related("airplane", "search_index"):
+            self.assertEqual(flight.get_seat_map().taken_count, sold[flight.id])
+            self.assertEqual(flight.search_index.sold, sold[flight.id])
+        self.assertGreater(rows["tickets"] / sum(
+            flight.airplane.capacity for flight in Flight.objects.select_related("airplane")
+        ), 0.6)
+
+        order = Order.objects.create(user=Order.objects.first().user)
+        self.assertEqual(order.id, rows["orders"] + 1)
+
+    def test_hub_and_spoke_routes(self):
+        SyntheticDataset(seed=1, start=START, **SIZES).create()
+
+        routes = Counter()
+        for source, destination in Route.objects.values_list("source_id", "destination_id"):
+            routes[source] += 1
+            routes[destination] += 1
+        spokes = [count for count in routes.values() if count <= 4]
+        self.assertEqual(len(routes), 8)
+        self.assertEqual(len(spokes), 6)
+
+    def test_airplanes_continue_from_where_they_landed(self):
+        SyntheticDataset(seed=1, start=START, **SIZES).create()
+
+        last = {}
+        for airplane_id, source_id, destination_id, departure, arrival in Flight.objects.order_by(
+            "departure_time"
+        ).values_list(
+            "airplane_id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        ):
+            if airplane_id in last:
+                self.assertEqual(last[airplane_id][0], source_id)
+                self.assertGreater(departure, last[airplane_id][1])
+            last[airplane_id] = destination_id, arrival
+
+    def test_same_seed_same_data_whatever_the_chunk_size(self):
+        savepoint = transaction.savepoint()
+        SyntheticDataset(seed=7, start=START, **SIZES).create()
+        first = ticket_rows()
+        transaction.savepoint_rollback(savepoint)
+
+        SyntheticDataset(
+            seed=7, start=START, batch_size=50, flights_per_chunk=4, **SIZES
+        ).create()
+
+        self.assertEqual(ticket_rows(), first)
+
+
+class BenchCommandTests(TestCase):
+    def test_report_written_as_json(self):
+        # --current-db runs next to data a previous seed left behind
+        SyntheticDataset(seed=0, start=START, **SIZES).create()
+        flights = Flight.objects.count()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            call_command(
+                "bench",
+                "--current-db",
+                "--airports=6",
+                "--airplanes=2",
+                "--flights=20",
+                "--requests=3",
+                "--warmup=1",
+                f"--output={path}",
+                stdout=io.StringIO(),
+            )
+            with open(path) as output:
+                report = json.load(output)
+
+        self.assertEqual(report["dataset"]["flights"], 20)
+        self.assertEqual(
+            set(report["endpoints"]),
+            {"flights_list", "flight_detail", "orders_create", "orders_list", "tickets_list"},
+        )
+        for result in report["endpoints"].values():
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["queries_per_request"], 0)
+        self.assertEqual(Flight.objects.count(), flights)
+
+
+class SeedAirportCommandTests(TestCase):
+    def test_seeds_empty_database_only(self):
+        out = io.StringIO()
+        call_command(
+            "seed_airport", "--airports=6", "--airplanes=2", "--flights=10", "--users=3",
+            stdout=out,
+        )
+
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertIn("10 flights", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("seed_airport", "--flights=1", stdout=io.StringIO())
+
+    def test_refuses_to_seed_over_any_seeded_model(self):
+        for create in (
+            lambda: Crew.objects.create(first_name="Olena", last_name="Shevchenko"),
+            lambda: get_user_model().objects.create_user(username="synthetic-0-0"),
+        ):
+            savepoint = transaction.savepoint()
+            create()
+            with self.assertRaisesMessage(CommandError, "already has"):
+                call_command("seed_airport", "--flights=1", stdout=io.StringIO())
+            transaction.savepoint_rollback(savepoint)
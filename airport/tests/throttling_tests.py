@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.throttling import ActionScopedSlidingWindowThrottle, SlidingWindowRateThrottle
+from airport.tests.order_flight_ticket_tests import ORDER_URL, sample_flight
+
+THROTTLE_RATES = {
+    'anon': '50/day',
+    'user': '200/day',
+    'search': '60/minute',
+    'order_create': '2/hour',
+    'bulk_import': '10/hour',
+}
+
+
+class FixedKeyThrottle(SlidingWindowRateThrottle):
+    rate = "10/min"
+
+    def get_cache_key(self, request, view):
+        return "throttle_test"
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.request = RequestFactory().get("/")
+
+    def allow(self, now):
+        throttle = FixedKeyThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limit_within_window(self):
+        results = [self.allow(1200 + second)[0] for second in range(11)]
+
+        self.assertEqual(results, [True] * 10 + [False])
+
+    def test_previous_window_is_weighted(self):
+        for second in range(10):
+            self.allow(1200 + second)
+
+        # a quarter into the next window 75% of the previous count still applies
+        allowed = [self.allow(1275)[0] for _ in range(4)]
+        self.assertEqual(allowed, [True, True, True, False])
+
+        allowed, throttle = self.allow(1275)
+        self.assertAlmostEqual(throttle.wait(), 3.0)
+
+    def test_window_is_a_single_counter(self):
+        for second in range(3):
+            self.allow(1200 + second)
+
+        self.assertEqual(caches['throttle'].get('throttle_test:20'), 3)
+
+
+class ActionScopedThrottleTests(TestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            email='user@test.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.user)
+
+    @mock.patch.object(ActionScopedSlidingWindowThrottle, 'THROTTLE_RATES', THROTTLE_RATES)
+    def test_order_create_scope(self):
+        flight = sample_flight()
+
+        statuses = [
+            self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": seat, "flight": flight.id}]},
+                format='json'
+            ).status_code
+            for seat in range(1, 4)
+        ]
+
+        self.assertEqual(
+            statuses,
+            [status.HTTP_201_CREATED, status.HTTP_201_CREATED, status.HTTP_429_TOO_MANY_REQUESTS]
+        )
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
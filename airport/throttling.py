@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Sliding-window counter throttle.
+
+    Each key keeps two integer counters (the current and the previous fixed
+    window) in the shared throttle cache, and the previous one is weighted by
+    how much of it still overlaps the sliding window. Memory per key stays
+    constant, unlike the request-timestamp history of SimpleRateThrottle.
+    """
+    cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        counters = self.cache.get_many([current_key, previous_key])
+        self.current = counters.get(current_key, 0)
+        self.previous = counters.get(previous_key, 0)
+        self.elapsed = (self.now % self.duration) / self.duration
+
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            return self.throttle_failure()
+
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        if self.current >= self.num_requests:
+            # only the next window can bring the estimate down
+            overlap_needed = 1
+        elif self.previous:
+            overlap_needed = 1 - (self.num_requests - self.current) / self.previous
+        else:
+            return None
+        return max(overlap_needed - self.elapsed, 0) * self.duration
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle, AnonRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle, UserRateThrottle):
+    pass
+
+
+class ActionScopedSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """
+    Throttles the view actions listed in view.throttle_scopes,
+    e.g. {"create": "order_create"}, with the rate of that scope.
+    """
+
+    def __init__(self):
+        # the scope, and with it the rate, is only known once the view calls us
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
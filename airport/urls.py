@@ -1,5 +1,6 @@
 from rest_framework import routers
 from django.urls import path, include
+from airport.async_views import flight_detail, flight_search, flight_seats
 from airport.views import (
     AirportViewSet,
     RouteViewSet,
@@ -8,7 +9,9 @@ from airport.views import (
     CrewViewSet,
     OrderViewSet,
     FlightViewSet,
-    TicketViewSet
+    ItineraryViewSet,
+    TicketViewSet,
+    ResponseCacheStatsView
 )
 
 
@@ -19,10 +22,16 @@ router.register(r"airports", AirportViewSet, basename="airports")
 router.register(r"crew", CrewViewSet, basename="crew")
 router.register(r"routes", RouteViewSet, basename="routes")
 router.register(r"flights", FlightViewSet, basename="flights")
+router.register(r"itineraries", ItineraryViewSet, basename="itineraries")
 router.register(r"orders", OrderViewSet, basename="orders")
 router.register(r"tickets", TicketViewSet, basename="tickets")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("cache-stats/", ResponseCacheStatsView.as_view(), name="cache-stats"),
+    path("async/flights/", flight_search, name="async-flights"),
+    path("async/flights/<int:pk>/", flight_detail, name="async-flight-detail"),
+    path("async/flights/<int:pk>/seats/", flight_seats, name="async-flight-seats"),
+]
 
 app_name = "airport"
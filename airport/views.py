@@ -1,11 +1,23 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAdminUser
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
 from airport.permissions import (
     IsAdminAllOrAuthenticatedOrReadOnly,
@@ -13,6 +25,30 @@ from airport.permissions import (
     IsAdminOrReadOnly
 )
 
+from airport.airport_search import suggest_airports
+from airport.cache import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    get_stats,
+    invalidate_model,
+)
+from airport.crew_schedule import busy_crew
+from airport.exports import get_date_range, stream_export
+from airport.fast_serializers import (
+    FLIGHT_VALUES,
+    TICKET_VALUES,
+    seat_map_data,
+    serialize_flights,
+    serialize_tickets,
+)
+from airport.itineraries import find_itineraries
+from airport.schedule_import import ScheduleImporter, read_schedule
+from airport.seat_holds import hold_seats
+from airport.throttling import (
+    ActionScopedSlidingWindowThrottle,
+    AnonSlidingWindowThrottle,
+    UserSlidingWindowThrottle,
+)
 from airport.models import (
     Airport,
     Route,
@@ -30,16 +66,18 @@ from airport.serializers import (
     AirplaneSerializer,
     AirplaneTypeSerializer,
     CrewSerializer,
+    CrewBulkSerializer,
     OrderSerializer,
     FlightSerializer,
     TicketSerializer,
-    # FlightListSerializer,
+    FlightListSerializer,
     # FlightDetailSerializer,
     CreateFlightSerializer,
     AirplaneListSerializer,
     AirplaneDetailSerializer,
     TicketListSerializer,
     TicketCreateSerializer,
+    SeatHoldSerializer,
 )
 
 
@@ -49,15 +87,94 @@ class Pagination(PageNumberPagination):
     page_size = 3
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class KeysetPagination(CursorPagination):
+    page_size_query_param = "size"
+    page_size = settings.CURSOR_PAGINATION_PAGE_SIZE
+    max_page_size = settings.CURSOR_PAGINATION_MAX_PAGE_SIZE
+
+
+class FlightCursorPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class TicketCursorPagination(KeysetPagination):
+    ordering = ("-id",)
+
+
+class CursorPaginationMixin:
+    """Switches the view to cursor_pagination_class when requested with ?paginate=cursor."""
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.cursor_pagination_class is not None
+            and self.request.query_params.get("paginate") == "cursor"
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class FastListMixin:
+    """
+    Serves list with ?fast=true from .values() rows through fast_serializer,
+    bypassing model instances and the DRF serializer fields.
+    """
+    fast_values = ()
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("fast") not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        queryset = queryset.values(*self.fast_values, *queryset.query.annotations)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer(page))
+        return Response(self.fast_serializer(queryset))
+
+
+class AirportViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
+    cache_models = (Airport,)
     serializer_class = AirportSerializer
     pagination_class = Pagination
     permission_classes = [IsAdminUser,]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [
+        AnonSlidingWindowThrottle,
+        UserSlidingWindowThrottle,
+        ActionScopedSlidingWindowThrottle,
+    ]
+    throttle_scopes = {"suggest": "search"}
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["name"]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="Beginning of an airport name or city",
+            )
+        ]
+    )
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminOrReadOnly])
+    def suggest(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This parameter is required."})
+
+        return Response(suggest_airports(query, settings.AIRPORT_SUGGEST_LIMIT))
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -73,12 +190,13 @@ class AirportViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Route.objects.all().select_related("source", "destination")
+    cache_models = (Route, Airport)
     serializer_class = RouteSerializer
     pagination_class = Pagination
     permission_classes = [IsAdminUser,]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle, UserSlidingWindowThrottle]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["source", "destination"]
 
@@ -109,12 +227,13 @@ class RouteViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class AirPlaneTypeViewSet(viewsets.ModelViewSet):
+class AirPlaneTypeViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
+    cache_models = (AirplaneType,)
     serializer_class = AirplaneTypeSerializer
     pagination_class = Pagination
     permission_classes = [IsAdminUser,]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle, UserSlidingWindowThrottle]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["name"]
 
@@ -133,13 +252,14 @@ class AirPlaneTypeViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class AirPlaneViewSet(viewsets.ModelViewSet):
+class AirPlaneViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.all().select_related("airplane_type")
+    cache_models = (Airplane, AirplaneType)
     serializer_class = AirplaneSerializer
     pagination_class = Pagination
     permission_classes = [IsAdminUser,]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle, UserSlidingWindowThrottle]
     filterset_fields = ["name"]
     ordering_fields = ["rows", "seats_in_row"]
 
@@ -168,15 +288,83 @@ class AirPlaneViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
+    cache_models = (Crew,)
     serializer_class = CrewSerializer
     pagination_class = Pagination
     permission_classes = [IsAdminUser]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle, UserSlidingWindowThrottle]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["first_name", "last_name"]
 
+    @staticmethod
+    def get_interval(params):
+        interval = {}
+        for name in ("from", "to"):
+            try:
+                value = parse_datetime(params.get(name, "").replace(" ", "+"))
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValidationError({name: "must be a datetime in ISO 8601 format"})
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            interval[name] = value
+
+        if interval["from"] >= interval["to"]:
+            raise ValidationError({"to": "must be later than from"})
+        return interval["from"], interval["to"]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="from",
+                type=OpenApiTypes.DATETIME,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="Start of the interval",
+            ),
+            OpenApiParameter(
+                name="to",
+                type=OpenApiTypes.DATETIME,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="End of the interval",
+            )
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def available(self, request):
+        """Crew not assigned to any flight between ?from= and ?to="""
+        starts_at, ends_at = self.get_interval(request.query_params)
+        queryset = self.filter_queryset(
+            self.get_queryset().exclude(pk__in=busy_crew(starts_at, ends_at))
+        ).order_by("id")
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @extend_schema(request=CrewBulkSerializer(many=True), responses=CrewSerializer(many=True))
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Create or keep every listed crew member, matched by first and last name"""
+        serializer = CrewBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            crew = Crew.upsert(
+                (
+                    (member["first_name"], member["last_name"])
+                    for member in serializer.validated_data
+                ),
+                batch_size=settings.CREW_BULK_BATCH_SIZE,
+            )
+        # bulk_create sends no post_save, so cached crew lists are dropped here
+        invalidate_model(Crew)
+
+        return Response(CrewSerializer(crew, many=True).data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -199,14 +387,40 @@ class CrewViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class ResponseCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class FlightViewSet(
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    FastListMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = FlightSerializer
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    fast_values = FLIGHT_VALUES
+    fast_serializer = staticmethod(serialize_flights)
+    version_fields = ("updated_at", "route__updated_at", "airplane__updated_at")
+    cursor_pagination_class = FlightCursorPagination
+    throttle_classes = [
+        AnonSlidingWindowThrottle,
+        UserSlidingWindowThrottle,
+        ActionScopedSlidingWindowThrottle,
+    ]
+    throttle_scopes = {"bulk": "bulk_import"}
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ["route__source", "departure_time", "arrival_time"]
-    ordering_fields = ["departure_time", "arrival_time"]
-    search_fields = ["route", "departure_time", "arrival_time"]
+    ordering_fields = ["departure_time", "arrival_time", "tickets_available"]
+    search_fields = [
+        "search_index__source_name",
+        "search_index__source_city",
+        "search_index__destination_name",
+        "search_index__destination_city",
+    ]
 
     def get_queryset(self):
         queryset = Flight.objects.select_related(
@@ -215,13 +429,121 @@ class FlightViewSet(viewsets.ModelViewSet):
             "airplane__airplane_type"
         ).prefetch_related("crew")
 
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.annotate(
+                tickets_available=F("search_index__capacity") - F("search_index__sold")
+            )
+            if self.action == "list":
+                queryset = self.filter_search_index(queryset, self.request.query_params)
+
+            min_available = self.request.query_params.get("min_available")
+            if min_available:
+                try:
+                    min_available = int(min_available)
+                except ValueError:
+                    raise ValidationError({"min_available": "must be an integer"})
+                queryset = queryset.filter(tickets_available__gte=min_available)
+
+        return queryset
+
+    @staticmethod
+    def filter_search_index(queryset, params):
+        """Filter by airport name or city and departure date on FlightSearchIndex"""
+        for param in ("source", "destination"):
+            if params.get(param):
+                # ids first, so the (source, destination, departure_time) index applies
+                airport_ids = list(
+                    Airport.objects.filter(
+                        Q(name__iexact=params[param]) | Q(closest_big_city__iexact=params[param])
+                    ).values_list("id", flat=True)
+                )
+                queryset = queryset.filter(**{f"search_index__{param}_id__in": airport_ids})
+
+        if params.get("date"):
+            try:
+                date = parse_date(params["date"])
+            except ValueError:
+                date = None
+            if date is None:
+                raise ValidationError({"date": "must be a date in YYYY-MM-DD format"})
+            queryset = queryset.filter(search_index__departure_date=date)
+
         return queryset
 
     def get_serializer_class(self):
         if self.action == "create":
             return CreateFlightSerializer
+        if self.action in ("list", "retrieve"):
+            return FlightListSerializer
+        if self.action == "holds":
+            return SeatHoldSerializer
         return self.serializer_class
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        upload = request.FILES.get("file")
+        if upload is not None:
+            file_format = upload.name.rsplit(".", 1)[-1].lower()
+            try:
+                rows = read_schedule(upload, file_format)
+            except ValueError as error:
+                raise ValidationError({"file": str(error)})
+        elif isinstance(request.data, list):
+            rows = enumerate(request.data, start=1)
+        else:
+            raise ValidationError({"file": "Upload a .csv or .jsonl file or send a JSON list"})
+
+        report = ScheduleImporter(settings.SCHEDULE_IMPORT_CHUNK_SIZE).run(
+            (line, row if isinstance(row, dict) else {"_invalid": row}) for line, row in rows
+        )
+        return Response(report)
+
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        flight = get_object_or_404(
+            Flight.objects.select_related("airplane").only(
+                "seat_map", "airplane__rows", "airplane__seats_in_row"
+            ),
+            pk=pk,
+        )
+        return Response(seat_map_data(flight.id, flight.get_seat_map()))
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
+    def holds(self, request, pk=None):
+        flight = get_object_or_404(
+            Flight.objects.select_related("airplane").only(
+                "seat_map", "airplane__rows", "airplane__seats_in_row"
+            ),
+            pk=pk,
+        )
+        serializer = SeatHoldSerializer(data=request.data, context={"flight": flight})
+        serializer.is_valid(raise_exception=True)
+        seats = [(seat["row"], seat["seat"]) for seat in serializer.validated_data["seats"]]
+        ttl = serializer.validated_data["ttl"]
+
+        seat_map = flight.get_seat_map()
+        conflicts = [seat for seat in seats if seat_map.is_taken(*seat)]
+        if not conflicts:
+            conflicts = hold_seats(flight.id, seats, request.user.id, ttl)
+
+        if conflicts:
+            return Response(
+                {
+                    "detail": "Some seats are already taken or held",
+                    "seats": [{"row": row, "seat": seat} for row, seat in conflicts],
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {
+                "flight": flight.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+                "expires_at": timezone.now() + timedelta(seconds=ttl),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -229,14 +551,21 @@ class FlightViewSet(viewsets.ModelViewSet):
                 type=str,
                 required=False,
                 location=OpenApiParameter.QUERY,
-                description="Filter by source",
+                description="Filter by source airport name or city",
             ),
             OpenApiParameter(
                 name="destination",
                 type=str,
                 required=False,
                 location=OpenApiParameter.QUERY,
-                description="Filter by destination",
+                description="Filter by destination airport name or city",
+            ),
+            OpenApiParameter(
+                name="date",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Filter by departure date (YYYY-MM-DD)",
             ),
             OpenApiParameter(
                 name="departure_time",
@@ -251,6 +580,27 @@ class FlightViewSet(viewsets.ModelViewSet):
                 required=False,
                 location=OpenApiParameter.QUERY,
                 description="Filter by arrival_time",
+            ),
+            OpenApiParameter(
+                name="min_available",
+                type=int,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Filter by minimum number of available tickets",
+            ),
+            OpenApiParameter(
+                name="paginate",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Use \"cursor\" for keyset pagination by departure_time",
+            ),
+            OpenApiParameter(
+                name="fast",
+                type=bool,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Serialize the list from raw rows (same payload, less overhead)",
             )
         ]
     )
@@ -258,11 +608,112 @@ class FlightViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class ItineraryViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminOrReadOnly,)
+    throttle_classes = [
+        AnonSlidingWindowThrottle,
+        UserSlidingWindowThrottle,
+        ActionScopedSlidingWindowThrottle,
+    ]
+    throttle_scopes = {"list": "search"}
+
+    @staticmethod
+    def _get_int_param(params, name, default=None):
+        value = params.get(name, default)
+        if value is None:
+            raise ValidationError({name: "This parameter is required."})
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: "must be an integer"})
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="from",
+                type=int,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="Departure airport id",
+            ),
+            OpenApiParameter(
+                name="to",
+                type=int,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="Arrival airport id",
+            ),
+            OpenApiParameter(
+                name="date",
+                type=str,
+                required=True,
+                location=OpenApiParameter.QUERY,
+                description="Departure date (YYYY-MM-DD)",
+            ),
+            OpenApiParameter(
+                name="max_legs",
+                type=int,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Maximum number of flights in an itinerary",
+            )
+        ]
+    )
+    def list(self, request):
+        params = request.query_params
+        source_id = self._get_int_param(params, "from")
+        destination_id = self._get_int_param(params, "to")
+        max_legs = self._get_int_param(params, "max_legs", 2)
+        if not 1 <= max_legs <= settings.ITINERARY_MAX_LEGS:
+            raise ValidationError(
+                {"max_legs": f"must be between 1 and {settings.ITINERARY_MAX_LEGS}"}
+            )
+        try:
+            date = parse_date(params.get("date", ""))
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError({"date": "must be a date in YYYY-MM-DD format"})
+
+        itineraries = find_itineraries(
+            source_id, destination_id, date, max_legs, settings.ITINERARY_LIMIT
+        )
+
+        flights = Flight.objects.select_related(
+            "route__source",
+            "route__destination",
+            "airplane__airplane_type"
+        ).prefetch_related("crew").in_bulk(
+            {flight_id for legs in itineraries for flight_id in legs}
+        )
+        data = []
+        for legs in itineraries:
+            first, last = flights[legs[0]], flights[legs[-1]]
+            data.append(
+                {
+                    "departure_time": first.departure_time,
+                    "arrival_time": last.arrival_time,
+                    "duration": str(last.arrival_time - first.departure_time),
+                    "legs": FlightSerializer(
+                        [flights[flight_id] for flight_id in legs], many=True
+                    ).data,
+                }
+            )
+
+        return Response(data)
+
+
+class OrderViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     pagination_class = Pagination
+    cursor_pagination_class = OrderCursorPagination
     permission_classes = (IsAdminAllOrAuthenticatedOrReadOnly,)
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [
+        AnonSlidingWindowThrottle,
+        UserSlidingWindowThrottle,
+        ActionScopedSlidingWindowThrottle,
+    ]
+    throttle_scopes = {"create": "order_create"}
     filter_backends = [OrderingFilter]
     ordering_fields = ["created_at"]
 
@@ -273,12 +724,50 @@ class OrderViewSet(viewsets.ModelViewSet):
             return queryset.none()
 
         if not self.request.user.is_staff:
-            queryset = queryset.filter(user=self.request.user)
+            queryset = queryset.filter(user_id=self.request.user.id)
 
         return queryset
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="date_from",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Orders created on or after this date (YYYY-MM-DD)",
+            ),
+            OpenApiParameter(
+                name="date_to",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Orders created on or before this date (YYYY-MM-DD)",
+            ),
+            OpenApiParameter(
+                name="file_format",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="csv (default) or jsonl",
+            )
+        ]
+    )
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def export(self, request):
+        header = ("id", "created_at", "user_id", "user_email", "tickets")
+        queryset = Order.objects.filter(
+            **get_date_range(request.query_params, "created_at")
+        ).annotate(tickets_count=Count("tickets")).order_by("id").values_list(
+            "id", "created_at", "user_id", "user__email", "tickets_count"
+        )
+
+        return stream_export(
+            request, queryset, header, "orders", request.query_params.get("file_format", "csv")
+        )
 
     @extend_schema(
         parameters=[
@@ -288,6 +777,13 @@ class OrderViewSet(viewsets.ModelViewSet):
                 required=False,
                 location=OpenApiParameter.QUERY,
                 description="Filter by created_at",
+            ),
+            OpenApiParameter(
+                name="paginate",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Use \"cursor\" for keyset pagination by created_at",
             )
         ]
     )
@@ -295,17 +791,129 @@ class OrderViewSet(viewsets.ModelViewSet):
         return super().list(request, args, kwargs)
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class RouteLabelSearchFilter(SearchFilter):
+    """
+    SearchFilter that also accepts route labels like "Boryspil - Lviv".
+
+    The part before the separator is matched against the source airport and
+    the part after it against the destination, so the reverse route is not
+    found. The view names both fields in route_label_fields.
+    """
+
+    separator = " - "
+
+    def filter_queryset(self, request, queryset, view):
+        search = request.query_params.get(self.search_param, "")
+        if self.separator not in search:
+            return super().filter_queryset(request, queryset, view)
+
+        source, destination = (part.strip() for part in search.split(self.separator, 1))
+        source_field, destination_field = view.route_label_fields
+        return queryset.filter(**{
+            f"{source_field}__icontains": source,
+            f"{destination_field}__icontains": destination,
+        })
+
+
+class TicketViewSet(CursorPaginationMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
+    fast_values = TICKET_VALUES
+    fast_serializer = staticmethod(serialize_tickets)
     pagination_class = Pagination
+    cursor_pagination_class = TicketCursorPagination
     permission_classes = (IsAdminReadOnly,)
-    filter_backends = [SearchFilter, OrderingFilter]
-    ordering_fields = ["flight__route__name"]
-    search_fields = ["flight__route__name"]
+    filter_backends = [RouteLabelSearchFilter, OrderingFilter]
+    ordering_fields = [
+        "flight__route__source__name",
+        "flight__route__destination__name",
+        "flight__departure_time",
+    ]
+    search_fields = ["flight__route__source__name", "flight__route__destination__name"]
+    route_label_fields = search_fields
 
     def get_queryset(self):
-        return self.queryset.select_related()
+        return self.queryset.select_related(
+            "flight__route__source",
+            "flight__route__destination",
+            "flight__airplane__airplane_type",
+            "order",
+        ).prefetch_related("flight__crew")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Search by route, e.g. \"Boryspil - Lviv\" or an airport name",
+            ),
+            OpenApiParameter(
+                name="ordering",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "flight__route__source__name, flight__route__destination__name "
+                    "or flight__departure_time, prefixed with - for descending"
+                ),
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, args, kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="date_from",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Tickets ordered on or after this date (YYYY-MM-DD)",
+            ),
+            OpenApiParameter(
+                name="date_to",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="Tickets ordered on or before this date (YYYY-MM-DD)",
+            ),
+            OpenApiParameter(
+                name="file_format",
+                type=str,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="csv (default) or jsonl",
+            )
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        header = (
+            "id", "order_id", "ordered_at", "user_id", "flight_id", "source",
+            "destination", "departure_time", "arrival_time", "row", "seat",
+        )
+        queryset = Ticket.objects.filter(
+            **get_date_range(request.query_params, "order__created_at")
+        ).order_by("id").values_list(
+            "id",
+            "order_id",
+            "order__created_at",
+            "order__user_id",
+            "flight_id",
+            "flight__route__source__name",
+            "flight__route__destination__name",
+            "flight__departure_time",
+            "flight__arrival_time",
+            "row",
+            "seat",
+        )
+
+        return stream_export(
+            request, queryset, header, "tickets", request.query_params.get("file_format", "csv")
+        )
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'airport_service.settings')
+# every async request runs its queries in its own sync_to_async thread, so a
+# persistent connection is never reused and stays open until the thread dies
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -24,9 +24,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-sxjyf@m(3k+ef4xwgr*xvvo!0f5zl9e1whhw3(uik4nt@y!=oe'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DJANGO_DEBUG", "false").lower() == "true"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
 
 
 # Application definition
@@ -43,21 +43,25 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',
     'airport',
-    'debug_toolbar',
     'user'
 ]
 
 MIDDLEWARE = [
+    'airport.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'airport.db_router.PrimaryPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.insert(2, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'airport_service.urls'
 
 TEMPLATES = [
@@ -90,9 +94,88 @@ DATABASES = {
         "PASSWORD": os.getenv('PASSWORD'),
         "HOST": os.getenv('HOST'),
         "PORT": os.getenv('PORT'),
+        # reuse connections between requests instead of reconnecting each time,
+        # WSGI only: airport_service/asgi.py defaults it to 0, compose pools with PgBouncer
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true",
+        # PgBouncer in transaction mode cannot keep named cursors across statements
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_PGBOUNCER", "false").lower() == "true",
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 5)),
+        },
+    }
+}
+
+# read replicas of the primary, e.g. DB_REPLICA_HOSTS=replica-1,replica-2
+DATABASE_REPLICAS = []
+replica_hosts = filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+for index, replica_host in enumerate(replica_hosts, 1):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": replica_host.strip(),
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["airport.db_router.PrimaryReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+
+CACHES = {
+    "default": {
+        "BACKEND": (
+            "django.core.cache.backends.redis.RedisCache"
+            if os.getenv("REDIS_URL")
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("REDIS_URL", ""),
+    },
+    "responses": {
+        "BACKEND": (
+            "django.core.cache.backends.redis.RedisCache"
+            if os.getenv("RESPONSE_CACHE_URL")
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("RESPONSE_CACHE_URL", "responses"),
+    },
+    "throttle": {
+        "BACKEND": (
+            "django.core.cache.backends.redis.RedisCache"
+            if os.getenv("THROTTLE_CACHE_URL")
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("THROTTLE_CACHE_URL", "throttle"),
+    },
 }
 
+THROTTLE_CACHE_ALIAS = "throttle"
+
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 3600))
+
+SEAT_HOLD_TTL = int(os.getenv("SEAT_HOLD_TTL", 300))
+SEAT_HOLD_MAX_TTL = int(os.getenv("SEAT_HOLD_MAX_TTL", 900))
+
+ITINERARY_MIN_CONNECTION_MINUTES = int(os.getenv("ITINERARY_MIN_CONNECTION_MINUTES", 45))
+ITINERARY_MAX_DURATION_HOURS = 48
+ITINERARY_MAX_LEGS = 4
+ITINERARY_LIMIT = 10
+
+AIRPORT_SUGGEST_LIMIT = 10
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+SCHEDULE_IMPORT_CHUNK_SIZE = int(os.getenv("SCHEDULE_IMPORT_CHUNK_SIZE", 1000))
+
+CREW_BULK_BATCH_SIZE = int(os.getenv("CREW_BULK_BATCH_SIZE", 1000))
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_PUBLISH_SECONDS = float(os.getenv("METRICS_PUBLISH_SECONDS", 10))
+METRICS_WORKER_TIMEOUT = int(os.getenv("METRICS_WORKER_TIMEOUT", 24 * 60 * 60))
+
+CURSOR_PAGINATION_PAGE_SIZE = int(os.getenv("CURSOR_PAGINATION_PAGE_SIZE", 20))
+CURSOR_PAGINATION_MAX_PAGE_SIZE = int(os.getenv("CURSOR_PAGINATION_MAX_PAGE_SIZE", 100))
+
 
 # DATABASES = {
 #     'default': {
@@ -105,16 +188,20 @@ DATABASES = {
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'airport.throttling.AnonSlidingWindowThrottle',
+        'airport.throttling.UserSlidingWindowThrottle'
     ],
     # 'DEFAULT_RENDERER_CLASSES': (
     #     'rest_framework.renderers.JSONRenderer',
     #     # 'rest_framework.renderers.BrowsableAPIRenderer',
     # ),
+    # an empty THROTTLE_RATE_* turns that limit off, e.g. for load tests
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '50/day',
-        'user': '200/day'
+        'anon': os.getenv('THROTTLE_RATE_ANON', '50/day') or None,
+        'user': os.getenv('THROTTLE_RATE_USER', '200/day') or None,
+        'search': os.getenv('THROTTLE_RATE_SEARCH', '60/minute') or None,
+        'order_create': '20/hour',
+        'bulk_import': '10/hour',
     },
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -123,7 +210,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.ClaimsJWTAuthentication',
     ),
 }
 
@@ -147,8 +234,12 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=3),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsUser",
 }
 
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -14,10 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from airport.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/airport/", include("airport.urls", namespace="airport")),
@@ -25,5 +28,8 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name="schema"),
     path('api/doc/swagger/', SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path('api/doc/redoc/', SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
+
+if settings.DEBUG:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
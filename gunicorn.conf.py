@@ -0,0 +1,30 @@
+"""
+Production server: gunicorn managing uvicorn workers that run the ASGI app.
+
+    gunicorn airport_service.asgi:application -c gunicorn.conf.py
+
+Each worker is one process with one event loop, so async views serve many
+concurrent slow clients without a thread per connection; sync DRF views run
+in the worker's thread pool.
+
+Workers share the version tokens of the in-process indexes (routes, airport
+search, crew schedule), replica pins and metrics through the default cache,
+so more than one worker requires REDIS_URL.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8002")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+if workers > 1 and not os.getenv("REDIS_URL"):
+    # a per-process LocMemCache would leave the other workers on stale data
+    raise RuntimeError(
+        f"{workers} workers need a shared default cache, set REDIS_URL or GUNICORN_WORKERS=1"
+    )
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = 1000
+accesslog = "-"
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+def user_cache_key(user_id):
+    return f"user:{user_id}"
+
+
+def inactive_user_key(user_id):
+    return f"user-inactive:{user_id}"
+
+
+# no password hash or other credentials in the cache
+CACHED_USER_FIELDS = (
+    "id", "username", "email", "first_name", "last_name", "is_staff", "is_superuser", "is_active"
+)
+
+
+def get_cached_user(user_id):
+    """
+    User with the CACHED_USER_FIELDS only, cached for USER_CACHE_TIMEOUT
+    seconds. It is read-only, save() would overwrite the other fields.
+    """
+    fields = cache.get(user_cache_key(user_id))
+    if fields is None:
+        fields = get_user_model().objects.filter(pk=user_id).values(*CACHED_USER_FIELDS).first()
+        if fields is None:
+            return None
+        cache.set(user_cache_key(user_id), fields, settings.USER_CACHE_TIMEOUT)
+    return get_user_model()(**fields)
+
+
+def invalidate_cached_user(user):
+    cache.delete(user_cache_key(user.pk))
+    if user.is_active:
+        cache.delete(inactive_user_key(user.pk))
+    else:
+        # issued tokens stay valid until they expire, and an access token
+        # refreshed at the end of the refresh token's life outlives it
+        lifetime = (
+            settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
+            + settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+        )
+        cache.set(inactive_user_key(user.pk), True, int(lifetime.total_seconds()))
+
+
+class ClaimsUser(TokenUser):
+    """Request user built from the id and is_staff claims of the access token."""
+
+    @cached_property
+    def user(self):
+        return get_cached_user(self.id)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that queries the user table at most once per
+    USER_CACHE_TIMEOUT for every user.
+
+    The request user is a ClaimsUser; views that need the full record use
+    ClaimsUser.user, which is served from the cache. A deactivation is seen
+    at once through the inactive marker where the cache is shared, and by
+    every process once its cached user expires where it is not.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if cache.get(inactive_user_key(user.id)) or not getattr(user.user, "is_active", False):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
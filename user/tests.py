@@ -1,3 +1,122 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import (
+    get_cached_user,
+    inactive_user_key,
+    invalidate_cached_user,
+    user_cache_key,
+)
+from user.serializers import ClaimsTokenObtainPairSerializer
+
+ME_URL = reverse("user:manage")
+TOKEN_URL = reverse("user:token_obtain_pair")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="passenger",
+            password="secret-password",
+            is_staff=True,
+        )
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+
+    def test_token_contains_user_claims(self):
+        res = self.client.post(
+            TOKEN_URL,
+            {"username": "passenger", "password": "secret-password"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        access = AccessToken(res.data["access"])
+        self.assertEqual(access["user_id"], self.user.id)
+        self.assertEqual(access["username"], "passenger")
+        self.assertTrue(access["is_staff"])
+        self.assertFalse(access["is_superuser"])
+
+    def test_authenticated_request_does_not_query_users(self):
+        # the first request caches the user to check it is still active
+        self.client.get(ORDER_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user_table = get_user_model()._meta.db_table
+        self.assertFalse(
+            any(user_table in query["sql"] for query in queries)
+        )
+
+    def test_me_served_from_cache(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["username"], "passenger")
+
+    def test_cached_user_has_no_password(self):
+        get_cached_user(self.user.id)
+
+        cached = cache.get(user_cache_key(self.user.id))
+        self.assertEqual(cached["username"], "passenger")
+        self.assertNotIn("password", cached)
+        self.assertFalse(get_cached_user(self.user.id).password)
+
+    def test_update_invalidates_cached_user(self):
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {"username": "renamed"})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["username"], "renamed")
+
+    def test_deactivated_user_rejected(self):
+        res = self.client.delete(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_in_other_process_seen_once_cached_user_expires(self):
+        self.client.get(ORDER_URL)
+        get_user_model().objects.filter(pk=self.user.id).update(is_active=False)
+
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
+        cache.delete(user_cache_key(self.user.id))
+        self.assertEqual(
+            self.client.get(ORDER_URL).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_deactivation_remembered_while_refreshed_tokens_live(self):
+        self.user.is_active = False
+        lifetime = (
+            settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
+            + settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+        )
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            invalidate_cached_user(self.user)
 
-# Create your tests here.
+        cache_set.assert_called_once_with(
+            inactive_user_key(self.user.id), True, int(lifetime.total_seconds())
+        )
@@ -1,18 +1,34 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 
+from user.authentication import (
+    ClaimsJWTAuthentication,
+    get_cached_user,
+    invalidate_cached_user,
+)
 from user.serializers import UserSerializer
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (ClaimsJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        if self.request.method == "GET":
+            return get_cached_user(self.request.user.id)
+        return get_user_model().objects.get(pk=self.request.user.id)
+
+    def perform_update(self, serializer):
+        invalidate_cached_user(serializer.save())
+
+    def perform_destroy(self, instance):
+        """Deactivate the user instead of deleting their orders"""
+        instance.is_active = False
+        instance.save(update_fields=["is_active"])
+        invalidate_cached_user(instance)